@@ -7,6 +7,140 @@
 
 """Context."""
 
+from contextlib import contextmanager
 from contextvars import ContextVar
+from functools import wraps
 
 context_schema: ContextVar[dict] = ContextVar("context_schema")
+
+dump_context: ContextVar[dict] = ContextVar("dump_context")
+
+
+@contextmanager
+def dump_scope():
+    """Open a dump scope shared by all fields serialized inside it.
+
+    Nested scopes reuse the outermost one, so that nested schemas share the
+    values resolved by their parent. Long-lived schemas which do not use
+    :class:`DumpScopeMixin` can wrap their dumps explicitly:
+
+    .. code-block:: python
+
+        with dump_scope():
+            schema.dump(obj)
+    """
+    scope = dump_context.get(None)
+    if scope is not None:
+        yield scope
+        return
+    scope = {}
+    token = dump_context.set(scope)
+    try:
+        yield scope
+    finally:
+        dump_context.reset(token)
+
+
+def resolve_per_dump(value):
+    """Resolve a value which may be a callable once per dump scope.
+
+    Outside of a dump scope the callable is called every time.
+    """
+    if not callable(value):
+        return value
+    scope = dump_context.get(None)
+    if scope is None:
+        return value()
+    key = ("resolve", value)
+    try:
+        return scope[key]
+    except KeyError:
+        result = scope[key] = value()
+        return result
+
+
+def memoize_per_dump(name, obj, func):
+    """Get a value derived from an object, computed once per dump scope.
+
+    Fields of the same dump (e.g. several ``Method`` or ``Function`` fields)
+    asking for the same named value of the same object share the result:
+
+    .. code-block:: python
+
+        def get_parent_title(self, obj):
+            parent = memoize_per_dump("parent", obj, resolve_parent)
+            return parent["title"]
+
+    The value is dropped with the dump scope. Outside of a dump scope
+    ``func(obj)`` is called every time.
+    """
+    scope = dump_context.get(None)
+    if scope is None:
+        return func(obj)
+    key = ("memo", name, id(obj))
+    entry = scope.get(key)
+    # The scope keeps a reference to the object, so its id is not reused.
+    if entry is None or entry[0] is not obj:
+        entry = scope[key] = (obj, func(obj))
+    return entry[1]
+
+
+def dump_memoized(func):
+    """Decorator memoizing a function of an object per dump scope.
+
+    See :func:`memoize_per_dump`.
+    """
+
+    @wraps(func)
+    def wrapper(obj):
+        return memoize_per_dump(func, obj, func)
+
+    return wrapper
+
+
+def context_cache(name):
+    """Get a named cache stored in the current schema context.
+
+    The cache lives as long as the ``context_schema`` value (typically one
+    request) and is dropped when the context is reset. Returns ``None`` if no
+    context is set.
+    """
+    try:
+        context = context_schema.get()
+    except LookupError:
+        return None
+    return context.setdefault(name, {})
+
+
+def dump_page():
+    """Get the page of the current dump scope.
+
+    The page is the list of objects of the outermost ``many=True`` dump of a
+    :class:`DumpScopeMixin` schema. It is a dict with the objects under
+    ``"objs"``, in which fields can store values computed for the whole page
+    at once. Returns ``None`` if there is no page.
+    """
+    scope = dump_context.get(None)
+    if scope is None:
+        return None
+    return scope.get("page")
+
+
+class DumpScopeMixin:
+    """Schema mixin opening a dump scope around each top-level dump.
+
+    For ``many=True`` dumps of a list, the list is made available to the
+    fields as the page of the scope (see :func:`dump_page`).
+    """
+
+    def dump(self, obj, *, many=None):
+        """Dump inside a dump scope."""
+        many = self.many if many is None else bool(many)
+        with dump_scope() as scope:
+            if not many or not isinstance(obj, (list, tuple)) or "page" in scope:
+                return super().dump(obj, many=many)
+            scope["page"] = {"objs": obj}
+            try:
+                return super().dump(obj, many=many)
+            finally:
+                del scope["page"]
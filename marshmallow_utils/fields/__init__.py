@@ -15,7 +15,12 @@ from .babel import (
     FormatTime,
 )
 from .contrib import Function, Method
-from .edtfdatestring import EDTFDateString, EDTFDateTimeString, EDTFLevel2DateString
+from .edtfdatestring import (
+    EDTFDateRange,
+    EDTFDateString,
+    EDTFDateTimeString,
+    EDTFLevel2DateString,
+)
 from .generated import GenFunction, GenMethod
 from .identifier import IdentifierSet, IdentifierValueSet
 from .isodate import ISODateString
@@ -33,6 +38,7 @@ __all__ = (
     "ALLOWED_HTML_ATTRS",
     "ALLOWED_HTML_TAGS",
     "BabelGettextDictField",
+    "EDTFDateRange",
     "EDTFDateString",
     "EDTFDateTimeString",
     "EDTFLevel2DateString",
@@ -8,13 +8,54 @@
 
 """Localized Extended Date(/Time) Format Level 0 date string field."""
 
+import re
+from datetime import datetime, timezone
+
 import arrow
 from babel import Locale
 from babel.core import negotiate_locale
 from babel.dates import LC_TIME, format_date, format_datetime, format_time
-from babel_edtf import format_edtf
+from babel_edtf import format_edtf, parse_edtf_level0
 from marshmallow import fields
 
+from ..context import context_cache, resolve_per_dump
+from .edtfdatestring import EDTFString
+
+#: Canonical ISO-8601 timestamps that ``datetime.fromisoformat`` handles
+#: identically to arrow on every supported Python version.
+ISO_CANONICAL_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}"
+    r"(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{3}|\.\d{6})?)?(?:Z|[+-]\d{2}:\d{2})?)?"
+)
+
+#: Parse tier used for canonical ISO-8601 strings.
+PARSE_TIER_ISO = "iso"
+
+#: Parse tier used for any other string (arrow's parser).
+PARSE_TIER_ARROW = "arrow"
+
+#: Name of the formatted-value cache in the schema context.
+FORMAT_CACHE_NAME = "babel_format_cache"
+
+
+def parse_iso_fast(value):
+    """Parse a canonical ISO-8601 string with ``datetime.fromisoformat``.
+
+    Naive values are interpreted as UTC, like ``arrow.get`` does. Returns
+    ``None`` if the value is not in a canonical form.
+    """
+    if not ISO_CANONICAL_RE.fullmatch(value):
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
 
 class BabelFormatField(fields.String):
     """Base classe for babel date and time formatting fields.
@@ -22,57 +63,149 @@ class BabelFormatField(fields.String):
     The babel format field is used only for dumping.
     """
 
-    def __init__(self, format="medium", locale=LC_TIME, parse=True, **kwargs):
+    def __init__(
+        self,
+        format="medium",
+        locale=LC_TIME,
+        parse=True,
+        cache=False,
+        locales=None,
+        **kwargs,
+    ):
         """Constructor.
 
         :param format: The format to use (either ``short``, ``medium``,
                        ``long`` or ``full``).
         :param locale: The current locale or a callable returning the current
-                       locale.
+                       locale. A callable is resolved once per dump scope
+                       (see :func:`marshmallow_utils.context.dump_scope`).
+        :param cache: Memoize formatted values in the schema context
+                      (``context_schema``), i.e. for the duration of the
+                      request.
+        :param locales: A list of locales (or a callable returning it). If
+                        set, the field dumps a ``{locale: value}`` mapping
+                        with the value formatted once per locale, and
+                        ``locale`` is ignored.
         """
         self._format = format
         self._locale = locale
         self._parse = parse
+        self._cache = cache
+        self._locales = locales
         kwargs.setdefault("dump_only", True)
         super().__init__(**kwargs)
 
     @property
     def locale(self):
         """Get the locale to use."""
-        return self._locale() if callable(self._locale) else self._locale
+        return resolve_per_dump(self._locale)
+
+    @property
+    def locales(self):
+        """Get the locales to use in multi-locale mode."""
+        return resolve_per_dump(self._locales)
 
     def parse(self, value, as_time=False, as_date=False, as_datetime=False):
         """Parse the value if it's a string."""
         if not self._parse or not isinstance(value, str):
             return value
+        return self.parse_with_tier(
+            value, as_time=as_time, as_date=as_date, as_datetime=as_datetime
+        )[0]
+
+    def parse_with_tier(self, value, as_time=False, as_date=False, as_datetime=False):
+        """Parse a string and report which parser tier handled it.
 
+        Canonical ISO-8601 strings are parsed with ``datetime.fromisoformat``
+        (:data:`PARSE_TIER_ISO`), everything else goes through ``arrow.get``
+        (:data:`PARSE_TIER_ARROW`).
+
+        :returns: A tuple ``(parsed_value, tier)``.
+        """
+        dt = parse_iso_fast(value)
+        if dt is not None:
+            tier = PARSE_TIER_ISO
+            if as_date:
+                return dt.date(), tier
+            elif as_time or as_datetime:
+                return dt, tier
+            return arrow.Arrow.fromdatetime(dt), tier
+
+        tier = PARSE_TIER_ARROW
         a = arrow.get(value)
         if as_time:
-            return a.datetime
+            return a.datetime, tier
         elif as_date:
-            return a.date()
+            return a.date(), tier
         elif as_datetime:
-            return a.datetime
+            return a.datetime, tier
         else:
-            return a
+            return a, tier
+
+    def parse_value(self, value):
+        """Prepare a value for formatting.
+
+        The result is shared between locales in multi-locale mode.
+        """
+        return value
+
+    def format_parsed(self, value, locale):
+        """Format a prepared value for a given locale."""
+        raise NotImplementedError()
 
     def format_value(self, value):
         """Format a given value using the chosen format function."""
-        raise NotImplementedError()
+        return self.format_parsed(self.parse_value(value), self.locale)
+
+    def format_locales(self, value):
+        """Format a given value for each of the configured locales."""
+        parsed = self.parse_value(value)
+        return {str(l): self.format_parsed(parsed, l) for l in self.locales}
+
+    def cache_key(self, value):
+        """Key identifying the formatted value in the cache."""
+        # Aware datetimes in different timezones compare equal, but are
+        # formatted differently.
+        return (
+            type(self),
+            value,
+            getattr(value, "tzinfo", None),
+            self._format,
+            self.locale,
+        )
+
+    def _format_cached(self, value):
+        """Format a value, using the context cache if enabled."""
+        cache = context_cache(FORMAT_CACHE_NAME) if self._cache else None
+        if cache is None:
+            return self.format_value(value)
+        try:
+            key = self.cache_key(value)
+            return cache[key]
+        except KeyError:
+            formatted = cache[key] = self.format_value(value)
+            return formatted
+        except TypeError:
+            # Unhashable value
+            return self.format_value(value)
 
     def _serialize(self, value, attr, data, **kwargs):
         """Serialize the value."""
-        return super()._serialize(self.format_value(value), attr, data, **kwargs)
+        if self._locales is not None:
+            return self.format_locales(value)
+        return super()._serialize(self._format_cached(value), attr, data, **kwargs)
 
 
 class FormatDate(BabelFormatField):
     """Format a date object."""
 
-    def format_value(self, value):
-        """Format an EDTF date."""
-        return format_date(
-            self.parse(value, as_date=True), format=self._format, locale=self.locale
-        )
+    def parse_value(self, value):
+        """Parse the date."""
+        return self.parse(value, as_date=True)
+
+    def format_parsed(self, value, locale):
+        """Format a date."""
+        return format_date(value, format=self._format, locale=locale)
 
 
 class FormatDatetime(BabelFormatField):
@@ -86,37 +219,51 @@ class FormatDatetime(BabelFormatField):
     @property
     def tzinfo(self):
         """Get the timzone to use."""
-        return self._tzinfo() if callable(self._tzinfo) else self._tzinfo
+        return resolve_per_dump(self._tzinfo)
 
-    def format_value(self, value):
-        """Format an EDTF date."""
+    def cache_key(self, value):
+        """Key identifying the formatted value in the cache."""
+        return super().cache_key(value) + (self.tzinfo,)
+
+    def parse_value(self, value):
+        """Parse the datetime."""
+        return self.parse(value, as_datetime=True)
+
+    def format_parsed(self, value, locale):
+        """Format a datetime."""
         return format_datetime(
-            self.parse(value, as_datetime=True),
-            format=self._format,
-            tzinfo=self.tzinfo,
-            locale=self.locale,
+            value, format=self._format, tzinfo=self.tzinfo, locale=locale
         )
 
 
 class FormatTime(FormatDatetime):
     """Format a time object."""
 
-    def format_value(self, value):
-        """Format an EDTF date."""
+    def parse_value(self, value):
+        """Parse the time."""
+        return self.parse(value, as_time=True)
+
+    def format_parsed(self, value, locale):
+        """Format a time."""
         return format_time(
-            self.parse(value, as_time=True),
-            format=self._format,
-            tzinfo=self.tzinfo,
-            locale=self.locale,
+            value, format=self._format, tzinfo=self.tzinfo, locale=locale
         )
 
 
 class FormatEDTF(BabelFormatField):
     """Format an EDTF-formatted string."""
 
-    def format_value(self, value):
+    def parse_value(self, value):
+        """Parse the EDTF string."""
+        if isinstance(value, EDTFString):
+            return value.edtf
+        if isinstance(value, str):
+            return parse_edtf_level0(value)
+        return value
+
+    def format_parsed(self, value, locale):
         """Format an EDTF date."""
-        return format_edtf(value, format=self._format, locale=self.locale)
+        return format_edtf(value, format=self._format, locale=locale)
 
 
 class BabelGettextDictField(fields.String):
@@ -135,6 +282,11 @@ class BabelGettextDictField(fields.String):
     and dumps this (in case the locale is english)::
 
         {'title': 'Text'}
+
+    In multi-locale mode (``locales=['en', 'da']``) it dumps one translation
+    per locale::
+
+        {'title': {'en': 'Text', 'da': 'Tekst'}}
     """
 
     default_error_messages = {
@@ -142,32 +294,40 @@ class BabelGettextDictField(fields.String):
         "missing_locale": "Translation not found for ",
     }
 
-    def __init__(self, locale, default_locale, **kwargs):
+    def __init__(self, locale, default_locale, locales=None, **kwargs):
         """Initialize the field.
 
         :param locale: The locale to lookup, or a function returning the
             locale.
         :param default_locale: The default locale in case the locale is not
             found. Can be a callable that returns the default locale.
+        :param locales: A list of locales (or a callable returning it) to
+            dump a ``{locale: translation}`` mapping for. If set, ``locale``
+            is ignored.
+
+        Callables are resolved once per dump scope (see
+        :func:`marshmallow_utils.context.dump_scope`).
         """
         self._locale = locale
         self._default_locale = default_locale
+        self._locales = locales
         kwargs["dump_only"] = True
         super().__init__(**kwargs)
 
     @property
     def locale(self):
         """Get the locale to be used."""
-        return self._locale() if callable(self._locale) else self._locale
+        return resolve_per_dump(self._locale)
 
     @property
     def default_locale(self):
         """Get the default locale to be used."""
-        return (
-            self._default_locale()
-            if callable(self._default_locale)
-            else self._default_locale
-        )
+        return resolve_per_dump(self._default_locale)
+
+    @property
+    def locales(self):
+        """Get the locales to use in multi-locale mode."""
+        return resolve_per_dump(self._locales)
 
     def _serialize(self, value, attr, obj, **kwargs):
         """Serialize the dict into a string.
@@ -179,14 +339,39 @@ class BabelGettextDictField(fields.String):
             return None
         if not isinstance(value, dict):
             raise self.make_error("invalid")
+        if self._locales is not None:
+            return self._serialize_locales(value)
         translated_str = gettext_from_dict(value, self.locale, self.default_locale)
         if translated_str is None:
             raise self.make_error("missing_locale")
         return super()._serialize(translated_str, attr, obj, **kwargs)
 
+    def _serialize_locales(self, catalog):
+        """Serialize the dict into a translation per locale."""
+        default_locale = self.default_locale
+        catalog_langs = _catalog_languages(catalog)
+        result = {}
+        for locale in self.locales:
+            translated_str = gettext_from_dict(
+                catalog, locale, default_locale, catalog_langs=catalog_langs
+            )
+            if translated_str is None:
+                raise self.make_error("missing_locale")
+            result[str(locale)] = translated_str
+        return result
+
+
+def _catalog_languages(catalog):
+    """Map the primary language of each catalog key to the key."""
+    return {Locale.parse(l).language: l for l in catalog}
 
-def gettext_from_dict(catalog, locale, default_locale):
-    """Get translation string from a dictionary."""
+
+def gettext_from_dict(catalog, locale, default_locale, catalog_langs=None):
+    """Get translation string from a dictionary.
+
+    :param catalog_langs: Precomputed language mapping of the catalog, to
+        share between lookups of several locales in the same catalog.
+    """
     # First try with negotiate_locale. Negotiate locale will not properly
     # negotiate e.g "en" when the available locales are "en_GB" and "da", even
     # though "en_GB" could be used.
@@ -198,7 +383,8 @@ def gettext_from_dict(catalog, locale, default_locale):
     # language itself might be found.
 
     # Extract language keys only.
-    catalog_langs = {Locale.parse(l).language: l for l in catalog}
+    if catalog_langs is None:
+        catalog_langs = _catalog_languages(catalog)
     if isinstance(locale, str):
         locale = Locale.parse(locale)
     if locale is not None and locale.language in catalog_langs:
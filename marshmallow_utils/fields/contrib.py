@@ -10,6 +10,7 @@
 
 import functools
 from inspect import getfullargspec, isfunction, ismethod
+from weakref import WeakKeyDictionary
 
 from marshmallow import fields, utils
 
@@ -24,6 +25,27 @@ def _get_func_args(func):
         return list(getfullargspec(func.__call__).args)
 
 
+_func_args_len_cache = WeakKeyDictionary()
+
+
+def _get_func_args_len(func):
+    """Get the number of arguments of a function, cached per function."""
+    # Bound methods are created on each attribute access, so cache their
+    # underlying function instead.
+    key = getattr(func, "__func__", func)
+    try:
+        return _func_args_len_cache[key]
+    except (KeyError, TypeError):
+        pass
+    args_len = len(_get_func_args(func))
+    try:
+        _func_args_len_cache[key] = args_len
+    except TypeError:
+        # Not weak referenceable or not hashable
+        pass
+    return args_len
+
+
 class Function(fields.Function):
     """Enhanced marshmallow Function field.
 
@@ -70,7 +92,7 @@ class Function(fields.Function):
         return value
 
     def _call_or_raise(self, func, value, attr, data=None):
-        func_args_len = len(_get_func_args(func))
+        func_args_len = _get_func_args_len(func)
         if func_args_len > 2:
             return func(value, self.parent.context, data)
         elif func_args_len > 1:
@@ -122,7 +144,7 @@ class Method(fields.Method):
                 method = utils.callable_or_raise(
                     getattr(self.parent, self.deserialize_method_name, None)
                 )
-                method_args_len = len(_get_func_args(method))
+                method_args_len = _get_func_args_len(method)
                 if method_args_len > 2:
                     return method(value, data)
                 return method(value)
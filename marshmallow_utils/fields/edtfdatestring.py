@@ -7,6 +7,12 @@
 
 """Extended Date(/Time) Format Level 0 date string field."""
 
+import calendar
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
 from babel_edtf import parse_edtf
 from edtf import (
     Date,
@@ -17,41 +23,251 @@ from edtf import (
     OneOfASet,
     UncertainOrApproximate,
 )
-from edtf.parser.grammar import ParseException
-from marshmallow import ValidationError, fields
+from edtf.parser.grammar import EDTFParseException, ParseException
+from marshmallow import ValidationError, fields, missing
 from marshmallow.validate import Validator
 
+#: Maximum number of distinct strings kept in the EDTF parse cache.
+EDTF_PARSE_CACHE_SIZE = 4096
+
+_PARSE_FAILED = object()
+
+
+@lru_cache(maxsize=EDTF_PARSE_CACHE_SIZE)
+def _parse_edtf_outcome(value):
+    """Parse an EDTF string, returning a marker instead of raising."""
+    try:
+        return parse_edtf(value)
+    except ParseException:
+        # The original exception carries the (very large) grammar in its
+        # message, so we only remember that parsing failed.
+        return _PARSE_FAILED
+
+
+def parse_edtf_cached(value):
+    """Parse an EDTF string using a bounded, thread-safe LRU cache.
+
+    Both successful parses and failures are cached, so repeated invalid
+    input is rejected cheaply as well.
+
+    :raises ParseException: If the value is not a valid EDTF string.
+    """
+    e = _parse_edtf_outcome(value)
+    if e is _PARSE_FAILED:
+        raise EDTFParseException(value)
+    return e
+
+
+parse_edtf_cached.cache_info = _parse_edtf_outcome.cache_info
+parse_edtf_cached.cache_clear = _parse_edtf_outcome.cache_clear
+
+_LEVEL0_DATE = r"([0-9]{4})(?:-([0-9]{2})(?:-([0-9]{2}))?)?"
+
+#: Canonical Level 0 dates (YYYY, YYYY-MM, YYYY-MM-DD) and intervals of them.
+LEVEL0_RE = re.compile(_LEVEL0_DATE + r"(?:/" + _LEVEL0_DATE + r")?")
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _level0_bounds(year, month, day):
+    """Get the lower and upper ``(year, month, day)`` of a Level 0 date.
+
+    Returns ``None`` if the month is not a calendar month (e.g. an EDTF
+    season), which is left to the EDTF parser, and ``False`` if the day does
+    not exist in the month.
+    """
+    y = int(year)
+    if month is None:
+        return (y, 1, 1), (y, 12, 31)
+    m = int(month)
+    if not 1 <= m <= 12:
+        return None
+    last_day = _DAYS_IN_MONTH[m - 1]
+    if m == 2 and calendar.isleap(y):
+        last_day = 29
+    if day is None:
+        return (y, m, 1), (y, m, last_day)
+    d = int(day)
+    if not 1 <= d <= last_day:
+        return False
+    return (y, m, d), (y, m, d)
+
+
+def _format_bound(bound):
+    """Format a ``(year, month, day, ...)`` bound as an ISO date."""
+    if isinstance(bound, float):
+        # Open intervals have infinite bounds
+        return None
+    year, month, day = bound[:3]
+    sign = "-" if year < 0 else ""
+    return f"{sign}{abs(year):04d}-{month:02d}-{day:02d}"
+
+
+@lru_cache(maxsize=EDTF_PARSE_CACHE_SIZE)
+def edtf_date_range(value):
+    """Get the ISO lower and upper strict bounds of an EDTF string.
+
+    Canonical Level 0 values are handled without the EDTF parser.
+
+    :returns: A tuple ``(lower, upper)``, with ``None`` for open bounds.
+    :raises ParseException: If the value is not a valid EDTF string.
+    """
+    match = LEVEL0_RE.fullmatch(value)
+    if match:
+        start = _level0_bounds(*match.group(1, 2, 3))
+        end = _level0_bounds(*match.group(4, 5, 6)) if match.group(4) else start
+        if start and end:
+            return _format_bound(start[0]), _format_bound(end[1])
+    e = parse_edtf_cached(value)
+    return _format_bound(e.lower_strict()), _format_bound(e.upper_strict())
+
+
+class EDTFString(str):
+    """EDTF string carrying its parsed EDTF object and bounds.
+
+    It compares, hashes and serializes (e.g. to JSON) like the original
+    string, while later consumers can reuse the parse result instead of
+    parsing the string again. The EDTF object is parsed lazily (through
+    :func:`parse_edtf_cached`) unless it was already provided by the
+    validator.
+    """
+
+    def __new__(cls, value, edtf=None):
+        """Create the string."""
+        obj = super().__new__(cls, value)
+        obj._edtf = edtf
+        obj._bounds = None
+        return obj
+
+    @property
+    def edtf(self):
+        """The parsed EDTF object."""
+        if self._edtf is None:
+            self._edtf = parse_edtf_cached(str(self))
+        return self._edtf
+
+    @edtf.setter
+    def edtf(self, value):
+        """Set the parsed EDTF object."""
+        self._edtf = value
+        self._bounds = None
+
+    def _get_bounds(self):
+        if self._bounds is None:
+            self._bounds = (self.edtf.lower_strict(), self.edtf.upper_strict())
+        return self._bounds
+
+    def lower_strict(self):
+        """Lower strict bound of the EDTF object (``struct_time``)."""
+        return self._get_bounds()[0]
+
+    def upper_strict(self):
+        """Upper strict bound of the EDTF object (``struct_time``)."""
+        return self._get_bounds()[1]
+
 
 class EDTFValidator(Validator):
     """EDTF validator."""
 
     default_message = "Please provide a valid date or interval."
 
+    #: Default maximum length of a value passed to the EDTF parser.
+    default_max_length = 128
+
+    #: Default maximum number of elements of an EDTF set.
+    default_max_set_size = 10
+
     def __init__(
         self,
         types=[Date, DateAndTime, Interval],
         chronological_interval=True,
         error=None,
+        max_length=default_max_length,
+        max_set_size=default_max_set_size,
     ):
         """Constructor.
 
         :params types: List of EDTFObject subclasses that you accept. Use
             EDTFObject to accept all levels.
+        :params max_length: Maximum length of a value. Longer values are
+            rejected without parsing. ``None`` disables the check.
+        :params max_set_size: Maximum number of elements in an EDTF set
+            (``OneOfASet`` or ``MultipleDates``). The parsing time grows
+            quickly with the number of elements. ``None`` disables the check.
         """
         self._types = types or []
         self._chronological_interval = chronological_interval
         self._error = error or self.default_message
+        self._max_length = max_length
+        self._max_set_size = max_set_size
 
     def _format_error(self, value, e):
         return self._error.format(input=value, edtf=e)
 
+    def _within_budget(self, value):
+        """Check the value against the input budget of the EDTF parser."""
+        if not isinstance(value, str):
+            return True
+        if self._max_length is not None and len(value) > self._max_length:
+            return False
+        # Commas only appear as separators of set elements.
+        if self._max_set_size is not None:
+            if value.count(",") + 1 > self._max_set_size:
+                return False
+        return True
+
+    def _validate_level0(self, value):
+        """Validate canonical Level 0 dates and intervals without parsing.
+
+        Returns ``True`` if the value is valid, ``False`` if it is not a valid
+        date, and ``None`` if the value must go through the EDTF parser
+        (including values rejected by type or chronology, so that the error
+        message is built from the parsed object).
+        """
+        match = LEVEL0_RE.fullmatch(value) if isinstance(value, str) else None
+        if match is None:
+            return None
+        start = _level0_bounds(*match.group(1, 2, 3))
+        if match.group(4) is None:
+            edtf_type, end = Date, start
+        else:
+            end = _level0_bounds(*match.group(4, 5, 6))
+            edtf_type = Interval
+        # Invalid days are only rejected if no bound needs the parser.
+        if start is None or end is None:
+            return None
+        if start is False or end is False:
+            return False
+
+        if self._types:
+            if not any([issubclass(edtf_type, t) for t in self._types]):
+                return None
+
+        if self._chronological_interval:
+            if end[1] < start[0]:
+                return None
+
+        return True
+
     def __call__(self, value):
         """Validate."""
+        if not self._within_budget(value):
+            raise ValidationError(self._format_error(value, None))
+
+        valid = self._validate_level0(value)
+        if valid is True:
+            return value
+        elif valid is False:
+            raise ValidationError(self._format_error(value, None))
+
         try:
-            e = parse_edtf(value)
+            e = parse_edtf_cached(value)
         except ParseException:
             raise ValidationError(self._format_error(value, None))
 
+        if isinstance(value, EDTFString) and value._edtf is None:
+            value.edtf = e
+
         if self._types:
             if not any([isinstance(e, t) for t in self._types]):
                 raise ValidationError(self._format_error(value, e))
@@ -66,8 +282,84 @@ class EDTFValidator(Validator):
 
         return value
 
+    def _validate_batch(self, values):
+        """Validate a batch of values, returning the errors by value."""
+        errors = {}
+        for value in values:
+            try:
+                self(value)
+            except ValidationError as e:
+                errors[value] = e.messages
+        return errors
+
+    def validate_many(self, values, workers=None, chunk_size=10000):
+        """Validate many values at once (e.g. during migrations).
+
+        The values are consumed in chunks of ``chunk_size`` to bound memory
+        use. Each distinct value of a chunk is validated once, and values
+        which need the EDTF parser are spread over a pool of ``workers``
+        processes (validated in-process if ``workers`` is not above 1).
+
+        :param values: An iterable of strings.
+        :returns: A dict mapping the index of each invalid value to its list
+            of error messages.
+        """
+        errors = {}
+        executor = ProcessPoolExecutor(workers) if workers and workers > 1 else None
+        try:
+            iterator = iter(values)
+            offset = 0
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+
+                fast, slow = [], []
+                for value in dict.fromkeys(chunk):
+                    if self._validate_level0(value) is None:
+                        slow.append(value)
+                    else:
+                        fast.append(value)
+
+                chunk_errors = self._validate_batch(fast)
+                if executor and slow:
+                    batches = [slow[i::workers] for i in range(workers)]
+                    for batch_errors in executor.map(self._validate_batch, batches):
+                        chunk_errors.update(batch_errors)
+                else:
+                    chunk_errors.update(self._validate_batch(slow))
+
+                for i, value in enumerate(chunk, offset):
+                    if value in chunk_errors:
+                        errors[i] = chunk_errors[value]
+                offset += len(chunk)
+        finally:
+            if executor:
+                executor.shutdown()
+        return errors
+
+
+class BaseEDTFString(fields.Str):
+    """Base class for EDTF string fields.
+
+    With ``parsed=True`` the field deserializes to an :class:`EDTFString`,
+    which carries the parse result to later stages (indexing, formatting).
+    """
+
+    def __init__(self, parsed=False, **kwargs):
+        """Constructor."""
+        self.parsed = parsed
+        super().__init__(**kwargs)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        """Deserialize the string."""
+        value = super()._deserialize(value, attr, data, **kwargs)
+        if self.parsed:
+            return EDTFString(value)
+        return value
+
 
-class EDTFDateString(fields.Str):
+class EDTFDateString(BaseEDTFString):
     """
     Extended Date Format Level 0 date string field.
 
@@ -80,7 +372,7 @@ class EDTFDateString(fields.Str):
         super().__init__(**kwargs)
 
 
-class EDTFDateTimeString(fields.Str):
+class EDTFDateTimeString(BaseEDTFString):
     """
     Extended Date(/Time) Format Level 0 date string field.
 
@@ -93,7 +385,7 @@ class EDTFDateTimeString(fields.Str):
         super().__init__(**kwargs)
 
 
-class EDTFLevel2DateString(fields.Str):
+class EDTFLevel2DateString(BaseEDTFString):
     """
     Extended Date Format Level 2 date string field.
 
@@ -116,3 +408,40 @@ class EDTFLevel2DateString(fields.Str):
             ),
         )
         super().__init__(**kwargs)
+
+
+class EDTFDateRange(fields.Field):
+    """EDTF date range field (dump only).
+
+    Dumps an EDTF string as a range of ISO dates, e.g. for indexing::
+
+        "2020-09/2020-10" -> {"gte": "2020-09-01", "lte": "2020-10-31"}
+
+    Open bounds are left out. Ranges are memoized per distinct EDTF string.
+    Invalid values are ignored (missing).
+    """
+
+    def __init__(self, **kwargs):
+        """Constructor."""
+        kwargs.setdefault("dump_only", True)
+        super().__init__(**kwargs)
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        """Serialize the EDTF string to a date range."""
+        if value is None:
+            return None
+        try:
+            if isinstance(value, EDTFString):
+                lower = _format_bound(value.lower_strict())
+                upper = _format_bound(value.upper_strict())
+            else:
+                lower, upper = edtf_date_range(value)
+        except ParseException:
+            return missing
+
+        result = {}
+        if lower is not None:
+            result["gte"] = lower
+        if upper is not None:
+            result["lte"] = upper
+        return result
@@ -8,12 +8,32 @@
 
 """Link store and field for generating links."""
 
+from collections.abc import Mapping
+from functools import partial
+from inspect import signature
 from warnings import warn
 
-from marshmallow import fields, missing
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
 from uritemplate import URITemplate
 
-from ..context import context_schema
+from ..context import context_cache, context_schema, dump_context, dump_page, dump_scope
+from ..links import CompiledURITemplate, LazyLinks
+from ..permissions import PERMISSION_CACHE_NAME, check_permission, check_permissions
+
+#: Deprecated ``self.context`` keys which have already been warned about.
+_warned_context_keys = set()
+
+
+def _warn_deprecated_context(key):
+    """Warn once per process about a key looked up in ``self.context``."""
+    if key in _warned_context_keys:
+        return
+    _warned_context_keys.add(key)
+    warn(
+        f"Using self.context for {key} is deprecated. Use marshmallow_utils.context:context_schema for it.",
+        DeprecationWarning,
+    )
 
 
 class Links(fields.Field):
@@ -22,16 +42,157 @@ class Links(fields.Field):
     # NOTE: forces serialization
     _CHECK_ATTRIBUTE = False
 
+    def __init__(self, lazy=False, **kwargs):
+        """Constructor.
+
+        :param lazy: Dump a :class:`marshmallow_utils.links.LazyLinks` mapping,
+            which only dumps the links when it is used.
+        """
+        self.lazy = lazy
+        super().__init__(**kwargs)
+
     def _serialize(self, value, attr, obj, *args, **kwargs):
         """Dump the field by using the contextual schema."""
-        factory = self.context.get("links_factory")
-        namespace = self.context.get("links_namespace")
-        schema = factory.get_schema(namespace, self.context) if factory else None
+        if self.lazy:
+            return LazyLinks(self._dump_links, obj, self.context)
+        return self._dump_links(obj, self.context)
+
+    def _dump_links(self, obj, context):
+        """Dump the links of an object."""
+        factory = context.get("links_factory")
+        namespace = context.get("links_namespace")
+        schema = factory.get_schema(namespace, context) if factory else None
         if schema:
-            return schema.dump(obj)
+            links = self._page_links(schema, obj)
+            if links is not None:
+                return links
+            # The links of the object share the context lookups.
+            with dump_scope():
+                return schema.dump(obj)
         else:
             return {}
 
+    def _page_links(self, schema, obj):
+        """Get the links of an object rendered together with its page.
+
+        On the first object of a page (see
+        :func:`marshmallow_utils.context.dump_page`), the links of all objects
+        of the page are rendered at once. Returns ``None`` if the object is
+        not part of the page.
+        """
+        page = dump_page()
+        if page is None:
+            return None
+        ids = page.get("ids")
+        if ids is None:
+            ids = page["ids"] = set(map(id, page["objs"]))
+        if id(obj) not in ids:
+            # E.g. a nested dump, or objects replaced by a pre dump processor.
+            return None
+        key = ("links", id(self))
+        if key not in page:
+            objs = page["objs"]
+            page[key] = dict(zip(map(id, objs), dump_links(schema, objs)))
+        # Objects occurring twice in the page are dumped again.
+        return page[key].pop(id(obj), None)
+
+
+def dump_links(schema, objs):
+    """Render the links of a links schema for a list of objects.
+
+    Gives the same result as ``schema.dump(objs, many=True)``, but each
+    :class:`Link` field resolves its context, permission and host once for
+    all objects. Schemas with other fields, with dump processors or which
+    customize the serialization (of the schema or of a link) are dumped
+    normally.
+    """
+    fields_ = schema.dump_fields
+    schema_cls = type(schema)
+    if (
+        schema._hooks[PRE_DUMP]
+        or schema._hooks[POST_DUMP]
+        or schema_cls.dump is not Schema.dump
+        or schema_cls._serialize is not Schema._serialize
+        or not all(
+            isinstance(f, Link) and type(f)._serialize is Link._serialize
+            for f in fields_.values()
+        )
+    ):
+        return schema.dump(objs, many=True)
+    _check_link_permissions(fields_.values())
+    results = [schema.dict_class() for _ in objs]
+    for attr_name, field in fields_.items():
+        key = field.data_key if field.data_key is not None else attr_name
+        for result, link in zip(results, field.serialize_many(objs)):
+            if link is not missing:
+                result[key] = link
+    return results
+
+
+def _check_link_permissions(links):
+    """Check the permissions of several links with a single call.
+
+    The decisions are cached for the request, where the links look them up.
+    """
+    permissions = {link.permission for link in links if link.permission}
+    if not permissions or context_cache(PERMISSION_CACHE_NAME) is None:
+        return
+    _, field_permission_check = next(iter(links))._resolve_context()
+    if field_permission_check:
+        check_permissions(field_permission_check, permissions)
+
+
+def _attribute_getter(path):
+    """Compile a dotted attribute path into a getter.
+
+    Each part of the path is looked up as a key in mappings and as an
+    attribute in other objects. Missing values give ``None``.
+    """
+    if callable(path):
+        return path
+    keys = path.split(".")
+
+    def getter(obj):
+        for key in keys:
+            if obj is None:
+                return None
+            if isinstance(obj, Mapping):
+                obj = obj.get(key)
+            else:
+                obj = getattr(obj, key, None)
+        return obj
+
+    return getter
+
+
+def compile_params(mapping, variables):
+    """Compile a ``{variable: attribute path}`` mapping into a params function.
+
+    Only the variables used by the template are computed.
+
+    :param mapping: Maps template variables to a dotted attribute path (e.g.
+        ``"parent.id"``) or to a function of the object.
+    :param variables: The variable names of the template.
+    """
+    getters = [
+        (var, _attribute_getter(path))
+        for var, path in mapping.items()
+        if var in variables
+    ]
+
+    def params(obj):
+        return {var: get(obj) for var, get in getters}
+
+    return params
+
+
+def _accepts_variables(func):
+    """Check if a params function has a ``variables`` argument."""
+    try:
+        return "variables" in signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
 
 def always(*args, **kwargs):
     """A function that returns True no matter what is passed to it."""
@@ -45,33 +206,69 @@ class Link(fields.Field):
     _CHECK_ATTRIBUTE = False
 
     def __init__(
-        self, template=None, params=None, permission=None, when=always, **kwargs
+        self,
+        template=None,
+        params=None,
+        permission=None,
+        when=always,
+        lazy=False,
+        **kwargs,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param template: A URI template or template string. It is compiled
+            once here (see :class:`marshmallow_utils.links.CompiledURITemplate`).
+        :param params: A function returning the template variables of an
+            object. If it has a ``variables`` argument, it is called with the
+            set of variable names of the template, so that it can compute
+            only those. Can also be a ``{variable: attribute path}`` mapping
+            (see :func:`compile_params`).
+        :param lazy: Dump a :class:`marshmallow_utils.links.LazyLink`, which
+            is only expanded when it is used. The permission, ``when`` and
+            ``params`` are still evaluated during the dump.
+        """
         if isinstance(template, str):
-            template = URITemplate(template)
+            template = CompiledURITemplate(template)
+        elif type(template) is URITemplate:
+            template = CompiledURITemplate(template.uri)
         self.template = template
         self.permission = permission
+        variables = frozenset(template.variable_names) if template else frozenset()
+        if isinstance(params, Mapping):
+            params = compile_params(params, variables)
+        elif callable(params) and _accepts_variables(params):
+            params = partial(params, variables=variables)
         self.params = params
         self.when = when
+        self.lazy = lazy
         super().__init__(**kwargs)
 
-    def _serialize(self, value, attr, obj, *args, **kwargs):
-        """Dump the link by using the context."""
+    def _resolve_context(self):
+        """Get the links factory and the field permission check.
+
+        Inside a dump scope they are looked up once for all links dumped with
+        the same context.
+        """
+        scope = dump_context.get(None)
+        if scope is None:
+            return self._lookup_context()
+        context = self.context
+        key = ("link_context", id(context))
+        cached = scope.get(key)
+        if cached is None or cached[0] is not context:
+            cached = scope[key] = (context, self._lookup_context())
+        return cached[1]
+
+    def _lookup_context(self):
+        """Look up the links factory and the field permission check."""
         if "links_factory" in self.context:
-            warn(
-                "Using self.context for links_factory is deprecated. Use marshmallow_utils.context:context_schema for it.",
-                DeprecationWarning,
-            )
+            _warn_deprecated_context("links_factory")
             factory = self.context.get("links_factory")
         else:
             factory = context_schema.get()["links_factory"]
 
         if "field_permission_check" in self.context:
-            warn(
-                "Using self.context for field_permission_check is deprecated. Use marshmallow_utils.context:context_schema for it.",
-                DeprecationWarning,
-            )
+            _warn_deprecated_context("field_permission_check")
             field_permission_check = self.context.get("field_permission_check")
         else:
             try:
@@ -79,11 +276,44 @@ class Link(fields.Field):
             except LookupError:
                 field_permission_check = False
 
+        return factory, field_permission_check
+
+    def _permitted(self, field_permission_check):
+        """Check the permission of the link."""
         if field_permission_check and self.permission:
-            if not field_permission_check(self.permission):
-                return missing
+            return check_permission(field_permission_check, self.permission)
+        return True
+
+    def _serialize(self, value, attr, obj, *args, **kwargs):
+        """Dump the link by using the context."""
+        factory, field_permission_check = self._resolve_context()
+        if not self._permitted(field_permission_check):
+            return missing
 
         if not self.when(obj):
             return missing
 
+        if self.lazy:
+            return factory.create_lazy_link(self.template, self.params(obj))
         return factory.create_link(self.template, self.params(obj))
+
+    def serialize_many(self, objs):
+        """Dump the link for a list of objects.
+
+        The context and the permission are checked once for all objects.
+
+        :returns: A list with the link (or ``missing``) of each object.
+        """
+        factory, field_permission_check = self._resolve_context()
+        if not self._permitted(field_permission_check):
+            return [missing] * len(objs)
+
+        selected = [self.when(obj) for obj in objs]
+        links = iter(
+            factory.create_links(
+                self.template,
+                [self.params(obj) for obj, sel in zip(objs, selected) if sel],
+                lazy=self.lazy,
+            )
+        )
+        return [next(links) if sel else missing for sel in selected]
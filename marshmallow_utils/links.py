@@ -8,12 +8,24 @@
 
 """Link store and field for generating links."""
 
+import re
 from collections import defaultdict
+from collections.abc import Mapping
+from contextvars import copy_context
+from threading import local
+from urllib.parse import quote
+from uuid import uuid4
 
 from marshmallow import Schema, fields, missing, post_dump
 from uritemplate import URITemplate
+from uritemplate.template import template_re
 from werkzeug.datastructures import MultiDict
 
+from .context import resolve_per_dump
+
+#: Name of a variable in a simple (level 1) template expression.
+SIMPLE_VARIABLE_RE = re.compile(r"[A-Za-z0-9_]+")
+
 
 def _unpack_dict(data):
     """Unpack lists inside a dict.
@@ -45,6 +57,200 @@ def _unpack_dict(data):
             yield key, value
 
 
+class CompiledURITemplate(URITemplate):
+    """URI template with a compiled expansion for simple templates.
+
+    Templates with only simple string expressions (e.g. ``/records/{pid}``)
+    are compiled into a format string at construction. Expanding them with
+    string or integer values then only requires quoting the values. Any
+    other template or value (operators, lists, dicts, ...) is expanded by
+    :class:`uritemplate.URITemplate`, which gives the same result.
+    """
+
+    def __init__(self, uri):
+        """Constructor."""
+        super().__init__(uri)
+        self._format, self._names = self._compile(uri)
+
+    @staticmethod
+    def _compile(uri):
+        """Compile the template into a format string and variable names."""
+        literals, names = [], []
+        pos = 0
+        for match in template_re.finditer(uri):
+            name = match.group(1)
+            if not SIMPLE_VARIABLE_RE.fullmatch(name):
+                return None, None
+            literals.append(uri[pos : match.start()])
+            names.append(name)
+            pos = match.end()
+        literals.append(uri[pos:])
+        escaped = [l.replace("{", "{{").replace("}", "}}") for l in literals]
+        return "{}".join(escaped), tuple(names)
+
+    def expand(self, var_dict=None, **kwargs):
+        """Expand the template with the given parameters."""
+        if self._format is None:
+            return super().expand(var_dict, **kwargs)
+        if var_dict:
+            values = dict(var_dict)
+            values.update(kwargs)
+        else:
+            values = kwargs
+        expanded = []
+        for name in self._names:
+            value = values.get(name)
+            if value is None:
+                expanded.append("")
+            elif type(value) is str:
+                expanded.append(quote(value, safe=""))
+            elif type(value) is int:
+                expanded.append(str(value))
+            else:
+                return super().expand(var_dict, **kwargs)
+        return self._format.format(*expanded)
+
+
+class LazyLink:
+    """A link which is only expanded when it is used.
+
+    The link holds the template, the template variables and the hostname, and
+    is expanded once, on :meth:`render`, ``str()``, comparison or JSON
+    encoding (see :func:`json_default`).
+    """
+
+    __slots__ = ("factory", "template", "vars", "host", "_link")
+
+    def __init__(self, factory, template, vars, host):
+        """Constructor."""
+        self.factory = factory
+        self.template = template
+        self.vars = vars
+        self.host = host
+        self._link = None
+
+    def render(self):
+        """Expand the link."""
+        if self._link is None:
+            self._link = self.factory.expand_link(self.template, self.vars, self.host)
+        return self._link
+
+    def __str__(self):
+        """Expand the link."""
+        return self.render()
+
+    def __repr__(self):
+        """Representation of the link."""
+        return f"LazyLink({self.template!r}, {self.vars!r}, {self.host!r})"
+
+    def __eq__(self, other):
+        """Compare the expanded link."""
+        if isinstance(other, LazyLink):
+            other = other.render()
+        return self.render() == other
+
+    def __hash__(self):
+        """Hash of the expanded link."""
+        return hash(self.render())
+
+
+class LazyLinks(Mapping):
+    """A mapping of links which is only dumped when it is used.
+
+    The dump function is called once, on the first access to the mapping, in
+    a copy of the context in which the mapping was created (i.e. with the same
+    ``context_schema``).
+    """
+
+    def __init__(self, dump, *args):
+        """Constructor.
+
+        :param dump: The function dumping the links.
+        :param args: The arguments of the dump function.
+        """
+        self._dump = dump
+        self._args = args
+        self._context = copy_context()
+        self._links = None
+
+    def render(self):
+        """Dump the links."""
+        if self._links is None:
+            self._links = self._context.run(self._dump, *self._args)
+        return self._links
+
+    def __getitem__(self, key):
+        """Get a link."""
+        return self.render()[key]
+
+    def __iter__(self):
+        """Iterate over the link names."""
+        return iter(self.render())
+
+    def __len__(self):
+        """Number of links."""
+        return len(self.render())
+
+    def __repr__(self):
+        """Representation of the links."""
+        if self._links is None:
+            return "LazyLinks(...)"
+        return f"LazyLinks({self._links!r})"
+
+
+def materialize_links(data):
+    """Expand all lazy links in dumped data.
+
+    Dicts and lists are updated in place.
+    """
+    if isinstance(data, LazyLink):
+        return data.render()
+    if isinstance(data, LazyLinks):
+        data = data.render()
+    if isinstance(data, dict):
+        for k, v in data.items():
+            data[k] = materialize_links(v)
+    elif isinstance(data, list):
+        for i, v in enumerate(data):
+            data[i] = materialize_links(v)
+    return data
+
+
+def json_default(obj):
+    """JSON encoder hook for lazy links.
+
+    .. code-block:: python
+
+        json.dumps(data, default=json_default)
+    """
+    if isinstance(obj, (LazyLink, LazyLinks)):
+        return obj.render()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _with_args(args, values):
+    """Copy query arguments and set some of them."""
+    if isinstance(args, MultiDict):
+        args = args.copy()
+        for k, v in values.items():
+            args.setlist(k, [v])
+        return args
+    return {**args, **values}
+
+
+def _substitute(value):
+    """Get the expansion of a query argument value.
+
+    Returns ``None`` if the value is not expanded verbatim by all template
+    operators.
+    """
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str) and quote(value, safe="") == value:
+        return value
+    return None
+
+
 class LinksFactory:
     """Utility class for keeping track of and resolve links.
 
@@ -56,18 +262,44 @@ class LinksFactory:
         """Constructor."""
         self._host = host
         self._config = config or {}
+        self._local = local()
+
+    def __getstate__(self):
+        """Get the state for copies and pickling, without the schemas."""
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state, with new thread-local schemas."""
+        self.__dict__.update(state)
+        self._local = local()
 
     def get_schema(self, namespace, context):
-        """Get the schema for a given namespace."""
-        schema = self._config.get(namespace)
-        if schema:
-            return schema(context=context or {})
+        """Get the schema for a given namespace.
+
+        Schema instances are created once per namespace and thread, and
+        reused with the given context.
+        """
+        schema_cls = self._config.get(namespace)
+        if not schema_cls:
+            return schema_cls
+        schemas = self._local.__dict__.setdefault("schemas", {})
+        schema = schemas.get(namespace)
+        if schema is None:
+            schema = schemas[namespace] = schema_cls(context=context or {})
+        else:
+            schema.context = context or {}
         return schema
 
     @property
     def host(self):
-        """Get the hostname."""
-        return self._host() if callable(self._host) else self._host
+        """Get the hostname.
+
+        A callable is resolved once per dump scope (see
+        :func:`marshmallow_utils.context.dump_scope`).
+        """
+        return resolve_per_dump(self._host)
 
     def create_link(self, template, vars):
         """Create the link template with the template variables.
@@ -75,22 +307,100 @@ class LinksFactory:
         :param template: URITemplate to expand.
         :param vars: The template variables for the expansion.
         """
+        return self.expand_link(template, vars, self.host)
+
+    def create_links(self, template, vars_list, lazy=False):
+        """Create one link per set of template variables.
+
+        The hostname is resolved once for all links.
+
+        :param template: URITemplate to expand.
+        :param vars_list: A list of template variables for the expansion.
+        :param lazy: Create :class:`LazyLink` objects.
+        """
+        host = self.host
+        if lazy:
+            return [LazyLink(self, template, vars, host) for vars in vars_list]
+        return [self.expand_link(template, vars, host) for vars in vars_list]
+
+    def create_lazy_link(self, template, vars):
+        """Create a link which is expanded when it is used.
+
+        :param template: URITemplate to expand.
+        :param vars: The template variables for the expansion.
+        """
+        return LazyLink(self, template, vars, self.host)
+
+    def expand_link(self, template, vars, host):
+        """Expand the link template for a given hostname."""
         return self.base_url(
-            host=self.host, rendered_path=template.expand(**self.preprocess_vars(vars))
+            host=host, rendered_path=template.expand(**self.preprocess_vars(vars))
+        )
+
+    def create_pagination_links(self, template, vars, pages, param="args"):
+        """Create the links of several pages of the same search.
+
+        The query arguments shared by all pages are encoded once. Only the
+        arguments which differ between the pages are substituted per link.
+
+        .. code-block:: python
+
+            factory.create_pagination_links(
+                URITemplate("/records{?args*}"),
+                {"args": {"q": "title:test", "size": 10}},
+                {"self": {"page": 2}, "prev": {"page": 1}, "next": {"page": 3}},
+            )
+
+        :param template: URITemplate to expand.
+        :param vars: The template variables, with the query arguments (a dict
+            or ``MultiDict``) under ``param``.
+        :param pages: Maps link names to the query arguments of the page
+            (e.g. ``page`` and ``size``).
+        :param param: The template variable of the query arguments.
+        :returns: A dict with the link of each page.
+        """
+        host = self.host
+        args = vars.get(param) or {}
+        keys = {k for page_args in pages.values() for k in page_args}
+        placeholders = {k: f"{uuid4().hex}{i}" for i, k in enumerate(sorted(keys))}
+        base = self.expand_link(
+            template, {**vars, param: _with_args(args, placeholders)}, host
         )
+        shared = all(base.count(p) == 1 for p in placeholders.values())
+
+        links = {}
+        for name, page_args in pages.items():
+            if shared and keys == set(page_args):
+                values = [
+                    (placeholders[k], _substitute(v)) for k, v in page_args.items()
+                ]
+                if all(v is not None for _, v in values):
+                    link = base
+                    for placeholder, value in values:
+                        link = link.replace(placeholder, value)
+                    links[name] = link
+                    continue
+            links[name] = self.expand_link(
+                template, {**vars, param: _with_args(args, page_args)}, host
+            )
+        return links
 
     @staticmethod
     def preprocess_vars(vars):
-        """Preprocess template variables before expansion."""
+        """Preprocess template variables before expansion.
+
+        Returns new template variables, ``vars`` is not modified.
+        """
+        processed = dict(vars)
         for k, v in vars.items():
             if isinstance(v, MultiDict):
-                vars[k] = list(sorted(v.items(multi=True)))
+                processed[k] = list(sorted(v.items(multi=True)))
             elif isinstance(v, dict):
                 # Note, we unpack dicts with list values at this level, because
                 # there are no meaningful templates that can make use of them
                 # (basically the lists just becomes URL encoded python objects)
-                vars[k] = list(_unpack_dict(v))
-        return vars
+                processed[k] = list(_unpack_dict(v))
+        return processed
 
     @staticmethod
     def base_url(scheme="https", host=None, rendered_path="/"):
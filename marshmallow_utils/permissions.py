@@ -8,72 +8,215 @@
 
 """Field-level permissions."""
 
+from copy import copy
 from warnings import warn
 
 from marshmallow import post_dump, pre_load
 
-from .context import context_schema
+from .context import context_cache, context_schema
+
+#: Name of the permission decision cache in the schema context.
+PERMISSION_CACHE_NAME = "field_permission_cache"
 
 
 class FieldPermissionError(Exception):
     """Marshmallow field permission error."""
 
 
+def permission_cache():
+    """Get the permission decision cache of the request.
+
+    The cache is stored in the schema context (``context_schema``) and
+    dropped together with it. Without a schema context, a new empty cache is
+    returned.
+    """
+    cache = context_cache(PERMISSION_CACHE_NAME)
+    return {} if cache is None else cache
+
+
+def check_permission(field_permission_check, action, cache=None):
+    """Check a permission, caching the decision.
+
+    Decisions are keyed by permission check and action.
+
+    :param cache: The decision cache, by default the cache of the request
+        (see :func:`permission_cache`).
+    """
+    if cache is None:
+        cache = permission_cache()
+    key = (field_permission_check, action)
+    try:
+        return cache[key]
+    except KeyError:
+        return check_permissions(field_permission_check, [action], cache)[action]
+    except TypeError:
+        # Unhashable action
+        return field_permission_check(action)
+
+
+def check_permissions(field_permission_check, actions, cache=None):
+    """Check several permissions at once, caching the decisions.
+
+    If the permission check has a ``check_many(actions)`` method returning a
+    ``{action: bool}`` dict, the actions which are not cached yet are checked
+    with a single call. Otherwise each action is checked on its own.
+
+    :returns: A ``{action: bool}`` dict.
+    """
+    if cache is None:
+        cache = permission_cache()
+    decisions = {}
+    pending = []
+    for action in dict.fromkeys(actions):
+        key = (field_permission_check, action)
+        if key in cache:
+            decisions[action] = cache[key]
+        else:
+            pending.append(action)
+    if pending:
+        check_many = getattr(field_permission_check, "check_many", None)
+        if check_many is not None:
+            results = check_many(pending)
+        else:
+            results = {action: field_permission_check(action) for action in pending}
+        for action in pending:
+            decisions[action] = cache[(field_permission_check, action)] = results[
+                action
+            ]
+    return decisions
+
+
+def _permitted_dump(dump):
+    """Wrap a schema ``dump`` method to skip the fields denied to the user."""
+
+    def permitted_dump(self, obj, *, many=None):
+        return dump(self._permitted_variant(), obj, many=many)
+
+    permitted_dump.__doc__ = dump.__doc__
+    permitted_dump._permitted = True
+    return permitted_dump
+
+
 class FieldPermissionsMixin:
-    """Mixin for filtering field-level permissions in marshmallow schemas."""
+    """Mixin for filtering field-level permissions in marshmallow schemas.
+
+    Fields denied to the user are not serialized: each dump uses a variant of
+    the schema without them. The variant fields are cached per schema and set
+    of denied fields.
+    """
 
     field_load_permissions = {}
     field_dump_permissions = {}
     default_load_action = None
     default_dump_action = None
 
-    @pre_load
-    def _permissions_filter_load(self, data, **kwargs):
+    #: Keys denied in the dump of a permission-specialized schema variant.
+    _denied_dump_keys = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Wrap the dump method of the schema."""
+        super().__init_subclass__(**kwargs)
+        # With ``class S(Schema, FieldPermissionsMixin)`` the dump method of
+        # the schema comes first in the MRO, so it can't be overridden here.
+        dump = getattr(cls, "dump", None)
+        if dump and "dump" not in cls.__dict__ and not hasattr(dump, "_permitted"):
+            cls.dump = _permitted_dump(dump)
+
+    def _field_permission_check(self):
+        """Get the field permission check."""
         if "field_permission_check" in self.context:
             warn(
                 "using self.context for field_permission_check is deprecated, use marshmallow_utils.context:context_schema for it.",
                 DeprecationWarning,
             )
-            field_permission_check = self.context.get("field_permission_check")
-        else:
-            try:
-                field_permission_check = context_schema.get()["field_permission_check"]
-            except LookupError:
-                field_permission_check = False
+            return self.context.get("field_permission_check")
+        try:
+            return context_schema.get()["field_permission_check"]
+        except LookupError:
+            return False
+
+    def _permission_actions(self):
+        """Get all actions referenced by the field permissions."""
+        actions = {self.default_load_action, self.default_dump_action}
+        for action in self.field_load_permissions.values():
+            actions.add(action or self.default_load_action)
+        for action in self.field_dump_permissions.values():
+            actions.add(action or self.default_dump_action)
+        actions.discard(None)
+        return actions
+
+    def _prefetch_permissions(self, field_permission_check, cache):
+        """Resolve all actions at once if the check supports ``check_many``.
+
+        Single-action checks are only called for the actions that are needed.
+        """
+        if getattr(field_permission_check, "check_many", None) is not None:
+            check_permissions(field_permission_check, self._permission_actions(), cache)
+
+    def _permitted_variant(self):
+        """Get a variant of the schema without the fields denied to the user."""
+        if self._denied_dump_keys is not None:
+            return self
+        field_permission_check = self._field_permission_check()
+        if not field_permission_check:
+            return self
+
+        cache = permission_cache()
+        self._prefetch_permissions(field_permission_check, cache)
+        denied = set()
+        for k in self.field_dump_permissions:
+            action = self.field_dump_permissions[k] or self.default_dump_action
+            if action and not check_permission(field_permission_check, action, cache):
+                denied.add(k)
+        denied = frozenset(denied)
+
+        variants = self.__dict__.setdefault("_permitted_dump_fields", {})
+        dump_fields = variants.get(denied)
+        if dump_fields is None:
+            dump_fields = variants[denied] = self.dict_class(
+                (name, field)
+                for name, field in self.dump_fields.items()
+                if (field.data_key if field.data_key is not None else name)
+                not in denied
+            )
+
+        variant = copy(self)
+        variant.dump_fields = dump_fields
+        variant._denied_dump_keys = denied
+        return variant
 
+    @pre_load
+    def _permissions_filter_load(self, data, **kwargs):
+        field_permission_check = self._field_permission_check()
         if field_permission_check:
+            cache = permission_cache()
+            self._prefetch_permissions(field_permission_check, cache)
             for k in self.field_load_permissions:
                 if k in data:
                     action = self.field_load_permissions[k] or self.default_load_action
-                    # TODO (Alex): Maybe cache?
-                    if action and not field_permission_check(action):
+                    if action and not check_permission(
+                        field_permission_check, action, cache
+                    ):
                         raise FieldPermissionError(k)
         return data
 
     @post_dump
     def _permissions_filter_dump(self, data, **kwargs):
-        if "field_permission_check" in self.context:
-            warn(
-                "using self.context for field_permission_check is deprecated, use marshmallow_utils.context:context_schema for it.",
-                DeprecationWarning,
-            )
-            field_permission_check = self.context.get("field_permission_check")
-        else:
-            try:
-                field_permission_check = context_schema.get()["field_permission_check"]
-            except LookupError:
-                field_permission_check = False
+        if self._denied_dump_keys is not None:
+            # Denied fields are not serialized, but other post dump
+            # processors might have added the keys.
+            for k in self._denied_dump_keys:
+                data.pop(k, None)
+            return data
 
+        field_permission_check = self._field_permission_check()
         if field_permission_check:
-            # Initialize permissions cache to avoid to re-compute permissions that are repeated
-            _permissions_cache = dict()
+            cache = permission_cache()
             for k in self.field_dump_permissions:
                 if k in data:
                     action = self.field_dump_permissions[k] or self.default_dump_action
-                    has_permission = _permissions_cache.get(action)
-                    if not has_permission:
-                        has_permission = field_permission_check(action)
-                        _permissions_cache[action] = has_permission
-                    if action and not has_permission:
+                    if action and not check_permission(
+                        field_permission_check, action, cache
+                    ):
                         del data[k]
         return data
@@ -9,8 +9,18 @@
 """Tests for marshmallow schema post dump permissions check."""
 
 import pytest
+from marshmallow import Schema, fields, post_dump
 
 from marshmallow_utils.context import context_schema
+from marshmallow_utils.fields import Link
+from marshmallow_utils.fields.links import dump_links
+from marshmallow_utils.links import LinksFactory
+from marshmallow_utils.permissions import (
+    PERMISSION_CACHE_NAME,
+    FieldPermissionError,
+    FieldPermissionsMixin,
+    check_permissions,
+)
 
 
 def mocked_field_permission_check(action, identity=None, **kwargs):
@@ -76,8 +86,8 @@ def test_post_dump_permissions_removal(test_schema, test_object, test_object2):
     assert "CERN" == test[1].get("address")
 
     assert (
-        mocked_field_permission_check.counter == 4
-    )  # since only 2 different permissions are defined in the attribute "field_dump_permissions" of the schema, we should only resolve 4 times the permissions (2 permissions checks * 2 different records)
+        mocked_field_permission_check.counter == 2
+    )  # the 2 permissions are resolved once per dump, not per record
 
 
 def test_post_dump_permissions_removal_context(test_schema, test_object, test_object2):
@@ -117,5 +127,169 @@ def test_post_dump_permissions_removal_context(test_schema, test_object, test_ob
     assert test[1].get("address") == "CERN"
 
     assert (
-        mocked_field_permission_check.counter == 4
-    )  # since only 2 different permissions are defined in the attribute "field_dump_permissions" of the schema, we should only resolve 4 times the permissions (2 permissions checks * 2 different records)
+        mocked_field_permission_check.counter == 2
+    )  # decisions are cached in the schema context, so the 2 permissions are resolved once for both records
+
+
+def test_permission_decision_cache():
+    """Decisions are cached for the request by load, dump and links."""
+    calls = []
+
+    def check(action):
+        calls.append(action)
+        return action == "read"
+
+    class LoadSchema(Schema, FieldPermissionsMixin):
+        field_load_permissions = {"name": "read", "address": "manage"}
+        field_dump_permissions = {"name": "read", "address": "manage"}
+
+        name = fields.String()
+        address = fields.String()
+        self = Link(template="/records/{name}", params=lambda o: o, permission="read")
+
+    context_schema.set(
+        {
+            "field_permission_check": check,
+            "links_factory": LinksFactory(host="localhost"),
+        }
+    )
+    schema = LoadSchema()
+    assert schema.load({"name": "a"}) == {"name": "a"}
+    pytest.raises(FieldPermissionError, schema.load, {"address": "b"})
+    assert schema.dump([{"name": "a", "address": "b"}] * 3, many=True)[2] == {
+        "name": "a",
+        "self": "https://localhost/records/a",
+    }
+    assert calls == ["read", "manage"]
+    assert PERMISSION_CACHE_NAME in context_schema.get()
+
+    # The cache is dropped together with the context.
+    context_schema.set({"field_permission_check": check})
+    schema.load({"name": "a"})
+    assert calls == ["read", "manage", "read"]
+
+
+def test_denied_fields_not_serialized(test_object, test_object2):
+    """Denied fields are not serialized, and the output is unchanged."""
+    serialized = []
+    mocked_field_permission_check.counter = 0
+
+    def serialize_address(obj):
+        serialized.append(obj.name)
+        return obj.address.upper()
+
+    class RestrictedSchema(Schema, FieldPermissionsMixin):
+        field_dump_permissions = {"name": "read", "secret": "manage"}
+
+        name = fields.String()
+        address = fields.Function(serialize_address, data_key="secret")
+
+        @post_dump
+        def add_flag(self, data, **kwargs):
+            data["flag"] = True
+            return data
+
+    class FilteringSchema(RestrictedSchema):
+        """Dump without the permission-specialized variant."""
+
+        def dump(self, obj, *, many=None):
+            return Schema.dump(self, obj, many=many)
+
+    objs = [test_object, test_object2]
+    for check in [mocked_field_permission_check, lambda action: True]:
+        context_schema.set({"field_permission_check": check})
+        serialized.clear()
+        expected = FilteringSchema().dump(objs, many=True)
+        assert len(serialized) == 2
+        serialized.clear()
+        assert RestrictedSchema().dump(objs, many=True) == expected
+        assert RestrictedSchema().dump(objs[0]) == expected[0]
+        assert len(serialized) == (3 if "secret" in expected[0] else 0)
+
+    # The variant fields are cached per set of denied fields.
+    schema = RestrictedSchema()
+    context_schema.set({"field_permission_check": mocked_field_permission_check})
+    schema.dump(objs[0])
+    context_schema.set({"field_permission_check": lambda action: True})
+    schema.dump(objs[0])
+    schema.dump(objs[1])
+    assert set(schema._permitted_dump_fields) == {frozenset(["secret"]), frozenset()}
+    assert list(schema.dump_fields) == ["name", "address"]
+
+
+def test_batch_permission_check():
+    """Permission checks with ``check_many`` resolve all actions at once."""
+
+    class BatchCheck:
+        def __init__(self):
+            self.calls = []
+
+        def __call__(self, action):
+            raise AssertionError("single action checked")
+
+        def check_many(self, actions):
+            self.calls.append(sorted(actions))
+            return {action: action != "manage" for action in actions}
+
+    class BatchSchema(Schema, FieldPermissionsMixin):
+        field_load_permissions = {"name": "update"}
+        field_dump_permissions = {"name": None, "secret": "manage"}
+        default_dump_action = "read"
+
+        name = fields.String()
+        secret = fields.String()
+
+    class LinksSchema(Schema):
+        self = Link(template="/{name}", params=lambda o: o, permission="read")
+        edit = Link(template="/{name}/edit", params=lambda o: o, permission="edit")
+        admin = Link(template="/{name}/admin", params=lambda o: o, permission="admin")
+
+    check = BatchCheck()
+    context_schema.set(
+        {
+            "field_permission_check": check,
+            "links_factory": LinksFactory(host="localhost"),
+        }
+    )
+    objs = [{"name": "a", "secret": "s"}, {"name": "b", "secret": "s"}]
+    assert BatchSchema().dump(objs, many=True) == [{"name": "a"}, {"name": "b"}]
+    assert BatchSchema().load({"name": "a"}) == {"name": "a"}
+    assert check.calls == [["manage", "read", "update"]]
+
+    assert dump_links(LinksSchema(), objs)[1] == {
+        "self": "https://localhost/b",
+        "edit": "https://localhost/b/edit",
+        "admin": "https://localhost/b/admin",
+    }
+    assert check.calls[1:] == [["admin", "edit"]]
+
+    # Plain checks are called per action.
+    assert check_permissions(lambda action: action == "read", ["read", "edit"]) == {
+        "read": True,
+        "edit": False,
+    }
+
+
+def test_single_action_check_calls():
+    """Single-action checks are only called for the needed actions."""
+    calls = []
+
+    def check(action):
+        calls.append(action)
+        return False
+
+    class SecretSchema(Schema, FieldPermissionsMixin):
+        field_load_permissions = {"secret": "admin_write"}
+        field_dump_permissions = {"secret": "admin"}
+        default_load_action = "update"
+
+        name = fields.String()
+        secret = fields.String()
+
+    context_schema.set({"field_permission_check": check})
+    assert SecretSchema().dump({"name": "a", "secret": "s"}) == {"name": "a"}
+    assert calls == ["admin"]
+    assert SecretSchema().load({"name": "a"}) == {"name": "a"}
+    assert calls == ["admin"]
+    pytest.raises(FieldPermissionError, SecretSchema().load, {"secret": "s"})
+    assert calls == ["admin", "admin_write"]
@@ -10,11 +10,13 @@
 
 from datetime import date, datetime
 
+import arrow
 import pytest
 from babel import Locale
 from babel.dates import get_timezone
 from marshmallow import Schema, ValidationError
 
+from marshmallow_utils.context import DumpScopeMixin, context_schema, dump_scope
 from marshmallow_utils.fields import (
     BabelGettextDictField,
     FormatDate,
@@ -22,7 +24,13 @@ from marshmallow_utils.fields import (
     FormatEDTF,
     FormatTime,
 )
-from marshmallow_utils.fields.babel import gettext_from_dict
+from marshmallow_utils.fields import babel as babel_fields
+from marshmallow_utils.fields.babel import (
+    FORMAT_CACHE_NAME,
+    PARSE_TIER_ARROW,
+    PARSE_TIER_ISO,
+    gettext_from_dict,
+)
 
 
 @pytest.fixture()
@@ -76,6 +84,52 @@ def test_format_date(dt):
     assert MySchema().dump({"date": "2021-01-01"}) == {"date": "01.01.2021"}
 
 
+ISO_CORPUS = [
+    "2020-11-08",
+    "2020-02-29",
+    "2020-11-08T23:22",
+    "2020-11-08T23:22:00",
+    "2020-11-08 23:22:00",
+    "2020-11-08T23:22:00Z",
+    "2020-11-08T23:22:00+00:00",
+    "2020-11-08T23:22:00+05:00",
+    "2020-11-08T23:22:00.123",
+    "2020-11-08T23:22:00.123456",
+    "2020-11-08T23:22:00.123456-03:30",
+    "2020-11-08T00:00:00.000000Z",
+]
+
+
+@pytest.mark.parametrize("value", ISO_CORPUS)
+def test_parse_iso_fast_path(value):
+    """The fromisoformat tier gives the same result as arrow."""
+    field = FormatDatetime()
+    a = arrow.get(value)
+    for kwargs, expected in [
+        ({"as_datetime": True}, a.datetime),
+        ({"as_time": True}, a.datetime),
+        ({"as_date": True}, a.date()),
+        ({}, a),
+    ]:
+        parsed, tier = field.parse_with_tier(value, **kwargs)
+        assert tier == PARSE_TIER_ISO
+        assert parsed == expected
+        assert getattr(parsed, "tzinfo", None) == getattr(expected, "tzinfo", None)
+        assert field.parse(value, **kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["2020-11-08T23:22:00.1234", "20201108", "2020-11-08T24:00:00", "2020-W45"],
+)
+def test_parse_arrow_fallback(value):
+    """Non-canonical values fall back to arrow."""
+    field = FormatDatetime()
+    parsed, tier = field.parse_with_tier(value, as_datetime=True)
+    assert tier == PARSE_TIER_ARROW
+    assert parsed == arrow.get(value).datetime
+
+
 def test_babelgettextdictfield():
     """Test the babel gettext dict field."""
 
@@ -113,6 +167,121 @@ def test_babelgettextdictfield_functions():
     # assert pytest.raises(ValidationError, s.dump, {'title': {'de': 'DE'}})
 
 
+def test_locale_resolved_once_per_dump(dt):
+    """Callable locale and tzinfo are resolved once per dump."""
+    calls = {"locale": 0, "tzinfo": 0}
+
+    def get_locale():
+        calls["locale"] += 1
+        return "da"
+
+    def get_tzinfo():
+        calls["tzinfo"] += 1
+        return get_timezone("America/Chicago")
+
+    class LocaleSchema(DumpScopeMixin, Schema):
+        date = FormatDate(locale=get_locale)
+        time = FormatTime(format="long", locale=get_locale, tzinfo=get_tzinfo)
+        title = BabelGettextDictField(locale=get_locale, default_locale=get_locale)
+
+    hits = [{"date": dt, "time": dt, "title": {"da": "DA"}}] * 10
+    result = LocaleSchema().dump(hits, many=True)
+    assert result[0] == {
+        "date": "8. nov. 2020",
+        "time": "17.22.00 -0600",
+        "title": "DA",
+    }
+    assert calls == {"locale": 1, "tzinfo": 1}
+
+    # Without a dump scope, callables are resolved for every value.
+    calls = {"locale": 0, "tzinfo": 0}
+    s = Schema.from_dict({"date": FormatDate(locale=get_locale)})()
+    s.dump([{"date": dt}] * 3, many=True)
+    assert calls["locale"] == 3
+
+    # Long-lived schemas can open the scope explicitly.
+    calls = {"locale": 0, "tzinfo": 0}
+    with dump_scope():
+        s.dump([{"date": dt}] * 3, many=True)
+        s.dump({"date": dt})
+    assert calls["locale"] == 1
+
+
+def test_format_cache(dt, monkeypatch):
+    """Formatted values are memoized in the schema context."""
+    calls = []
+
+    def counting(func):
+        def wrapper(*args, **kwargs):
+            calls.append(func.__name__)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    for name in ["format_date", "format_datetime", "format_time"]:
+        monkeypatch.setattr(babel_fields, name, counting(getattr(babel_fields, name)))
+
+    class CachedSchema(Schema):
+        date = FormatDate(format="short", locale="da", cache=True)
+        datetime = FormatDatetime(locale="da", cache=True)
+        time = FormatTime(format="long", locale="da", tzinfo=get_timezone("UTC"))
+        uncached = FormatDate(attribute="date", format="short", locale="da")
+
+    hits = [{"date": dt, "datetime": dt.isoformat(), "time": dt}] * 5
+    context_schema.set({})
+    result = CachedSchema().dump(hits, many=True)
+    assert result[4] == {
+        "date": "08.11.2020",
+        "datetime": "8. nov. 2020 23.22.00",
+        "time": "23.22.00 UTC",
+        "uncached": "08.11.2020",
+    }
+    assert calls.count("format_date") == 1 + 5
+    assert calls.count("format_datetime") == 1
+    assert calls.count("format_time") == 5
+    assert len(context_schema.get()[FORMAT_CACHE_NAME]) == 2
+
+    # The cache is dropped together with the context.
+    context_schema.set({})
+    CachedSchema().dump(hits[0])
+    assert calls.count("format_datetime") == 2
+
+    # Same instant in another timezone is not mixed up.
+    other_tz = dt.replace(tzinfo=get_timezone("UTC"))
+    assert CachedSchema().dump({"date": other_tz})["date"] == "08.11.2020"
+    tokyo = other_tz.astimezone(get_timezone("Asia/Tokyo"))
+    assert CachedSchema().dump({"date": tokyo})["date"] == "09.11.2020"
+
+
+def test_multi_locale(dt):
+    """Multi-locale mode dumps one value per locale."""
+
+    class IndexSchema(Schema):
+        date = FormatDate(format="long", locales=["en", "da"])
+        datetime = FormatDatetime(
+            format="short", locales=lambda: ["en", "da"], tzinfo=get_timezone("UTC")
+        )
+        edtf = FormatEDTF(format="long", locales=["en", "da"])
+        title = BabelGettextDictField(None, "en", locales=["en_US", "da", "de"])
+
+    assert IndexSchema().dump(
+        {
+            "date": dt.isoformat(),
+            "datetime": dt,
+            "edtf": "2020-09/2020-10",
+            "title": {"en": "Text", "da": "Tekst"},
+        }
+    ) == {
+        "date": {"en": "November 8, 2020", "da": "8. november 2020"},
+        "datetime": {"en": "11/8/20, 11:22\u202fPM", "da": "08.11.2020 23.22"},
+        "edtf": {
+            "en": "September\u2009–\u2009October 2020",
+            "da": "september–oktober 2020",
+        },
+        "title": {"en_US": "Text", "da": "Tekst", "de": "Text"},
+    }
+
+
 def test_gettext_from_dict():
     """Test the locale negotiation."""
     assert gettext_from_dict({"en": "en", "en_US": "en_US"}, "en_US", "da") == "en_US"
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# Marshmallow-Utils is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Test the dump scope."""
+
+from marshmallow import Schema, fields
+
+from marshmallow_utils.context import (
+    DumpScopeMixin,
+    dump_context,
+    dump_memoized,
+    dump_scope,
+    memoize_per_dump,
+    resolve_per_dump,
+)
+from marshmallow_utils.fields import contrib
+
+
+def test_dump_scope_nesting():
+    """Nested scopes reuse the outermost scope."""
+    assert dump_context.get(None) is None
+    with dump_scope() as outer:
+        with dump_scope() as inner:
+            assert inner is outer
+        assert dump_context.get() is outer
+    assert dump_context.get(None) is None
+
+
+def test_resolve_per_dump():
+    """Callables are resolved once per scope."""
+    calls = []
+
+    def get_value():
+        calls.append(1)
+        return "value"
+
+    assert resolve_per_dump("static") == "static"
+    assert resolve_per_dump(get_value) == "value"
+    assert resolve_per_dump(get_value) == "value"
+    assert len(calls) == 2
+
+    with dump_scope():
+        assert resolve_per_dump(get_value) == "value"
+        assert resolve_per_dump(get_value) == "value"
+    assert len(calls) == 3
+
+    with dump_scope():
+        assert resolve_per_dump(get_value) == "value"
+    assert len(calls) == 4
+
+
+def test_dump_scope_mixin():
+    """The mixin opens a scope for each top-level dump."""
+    scopes = []
+
+    class MySchema(DumpScopeMixin, Schema):
+        value = fields.Function(lambda o: scopes.append(dump_context.get()))
+
+    MySchema().dump([{}, {}], many=True)
+    assert len(scopes) == 2
+    assert scopes[0] is scopes[1]
+    assert dump_context.get(None) is None
+
+
+def test_memoize_per_dump():
+    """Derived values are shared by the fields of a dump."""
+    calls = []
+    slugs = []
+
+    def get_slug(obj):
+        slugs.append(obj["id"])
+        return f"p-{obj['id']}"
+
+    @dump_memoized
+    def resolve_parent(obj):
+        calls.append(obj["id"])
+        return {"id": obj["id"] + 100, "title": f"parent {obj['id']}"}
+
+    class RecordSchema(DumpScopeMixin, Schema):
+        parent_id = contrib.Function(lambda obj: resolve_parent(obj)["id"])
+        parent_title = contrib.Method("get_parent_title")
+
+        parent_slug = contrib.Function(
+            lambda obj: memoize_per_dump("slug", obj, get_slug)
+        )
+
+        def get_parent_title(self, obj):
+            return resolve_parent(obj)["title"]
+
+    hits = [{"id": 1}, {"id": 2}]
+    assert RecordSchema().dump(hits, many=True) == [
+        {"parent_id": 101, "parent_title": "parent 1", "parent_slug": "p-1"},
+        {"parent_id": 102, "parent_title": "parent 2", "parent_slug": "p-2"},
+    ]
+    assert calls == [1, 2]
+    assert slugs == [1, 2]
+    assert RecordSchema().dump(hits[0])["parent_title"] == "parent 1"
+    assert calls == [1, 2, 1]
+
+    # Outside of a dump scope nothing is memoized.
+    assert resolve_parent(hits[0]) == resolve_parent(hits[0])
+    assert calls == [1, 2, 1, 1, 1]
+
+    # Values are keyed by object, not by equality.
+    with dump_scope():
+        memoize_per_dump("name", {"id": 1}, lambda obj: obj)
+        assert memoize_per_dump("name", {"id": 1}, lambda obj: 2) == 2
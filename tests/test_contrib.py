@@ -10,7 +10,7 @@
 import pytest
 from marshmallow import Schema, ValidationError
 
-from marshmallow_utils.fields import Function, Method
+from marshmallow_utils.fields import Function, GenFunction, GenMethod, Method, contrib
 
 
 def serialize_foo(obj, context):
@@ -55,3 +55,55 @@ def test_contrib_method_field_load():
     assert BarSchema().load({"bar": 12123}) == {
         "bar": {"deserialize_args": {"value": 23, "data": 24}}
     }
+
+
+def test_contrib_args_len_cache(monkeypatch):
+    calls = []
+    get_func_args = contrib._get_func_args
+
+    def counting(func):
+        calls.append(func)
+        return get_func_args(func)
+
+    monkeypatch.setattr(contrib, "_get_func_args", counting)
+
+    def deserialize_f(value, context, data):
+        return data["f"]
+
+    class GenSchema(Schema):
+        f = Function(serialize_foo, deserialize_f)
+        bar = Method("serialize_bar", "deserialize_bar")
+        gen = GenMethod(deserialize="deserialize_gen")
+        lam = GenFunction(deserialize=lambda value: "lam")
+
+        def serialize_bar(self, obj):
+            return "bar"
+
+        def deserialize_bar(self, value, data):
+            return data["bar"] * 2
+
+        def deserialize_gen(self, value):
+            return "gen"
+
+    for schema in [GenSchema(), GenSchema()]:
+        for i in range(3):
+            assert schema.load({"f": 1, "bar": i}) == {
+                "f": 1,
+                "bar": i * 2,
+                "gen": "gen",
+                "lam": "lam",
+            }
+    assert len(calls) == 4
+
+    # Callables which can't be weakly referenced are inspected every time.
+    class Callable:
+        __slots__ = ()
+
+        def __call__(self, value, context, data):
+            return "callable"
+
+    calls.clear()
+    schema = Schema.from_dict({"c": Function(deserialize=Callable())})()
+    assert schema.load({"c": 1}) == {"c": "callable"}
+    assert schema.load({"c": 1}) == {"c": "callable"}
+    assert len(calls) == 2
@@ -7,13 +7,27 @@
 
 """Test the localization of EDTF string."""
 
+import json
+import pickle
+import time
+
 import pytest
+from edtf import Date, DateAndTime, EDTFObject, Interval
+from edtf.parser.grammar import ParseException
 from marshmallow import Schema, ValidationError
 
 from marshmallow_utils.fields import (
+    EDTFDateRange,
     EDTFDateString,
     EDTFDateTimeString,
     EDTFLevel2DateString,
+    FormatEDTF,
+)
+from marshmallow_utils.fields.edtfdatestring import (
+    EDTFString,
+    EDTFValidator,
+    edtf_date_range,
+    parse_edtf_cached,
 )
 
 
@@ -74,3 +88,224 @@ def test_load_datetime():
     pytest.raises(
         ValidationError, s.load, {"datetime": "2020-01-01T10:00:00/2020-02-01T10:00:00"}
     )
+
+
+def test_parse_cache():
+    parse_edtf_cached.cache_clear()
+    s = TestSchemaLVL2Date()
+    for _ in range(3):
+        assert s.load({"date": "2020?"})
+        pytest.raises(ValidationError, s.load, {"date": "2020-09-21garbage"})
+    # Shared between the different fields
+    pytest.raises(ValidationError, TestSchemaDate().load, {"date": "2020?"})
+    info = parse_edtf_cached.cache_info()
+    assert info.misses == 2
+    assert info.hits == 5
+    pytest.raises(ParseException, parse_edtf_cached, "2020-09-21garbage")
+
+
+def test_level0_fast_path_skips_parser():
+    parse_edtf_cached.cache_clear()
+    s = TestSchemaDate()
+    assert s.load({"date": "2020-02-29/2021"})
+    pytest.raises(ValidationError, s.load, {"date": "2021-02-29"})
+    assert parse_edtf_cached.cache_info().misses == 0
+    # Not chronological: the parser builds the error
+    pytest.raises(ValidationError, s.load, {"date": "2021/2020"})
+    assert parse_edtf_cached.cache_info().misses == 1
+
+
+class ParsingEDTFValidator(EDTFValidator):
+    """Validator always going through the EDTF parser."""
+
+    def _validate_level0(self, value):
+        return None
+
+
+def _level0_corpus():
+    """Generate combinations of date components.
+
+    Covers all two-digit months (including EDTF seasons 21-41) and non-ASCII
+    digits.
+    """
+    years = ["0000", "2020", "2021"]
+    months = [f"{m:02d}" for m in range(100)]
+    day_months = ["00", "01", "02", "04", "12", "13", "21", "41", "99"]
+    days = ["00", "01", "28", "29", "30", "31", "32"]
+    for m in months:
+        yield f"2020-{m}"
+    for y in years:
+        yield y
+        for m in day_months:
+            for d in days:
+                yield f"{y}-{m}-{d}"
+    # Non-ASCII digits (Arabic-Indic and fullwidth) in each component
+    for digits in ["\u0660\u0661\u0662", "\uff10\uff11\uff12"]:
+        zero, one, two = digits
+        yield f"{two}{zero}{two}{zero}"
+        yield f"2020-{zero}{one}"
+        yield f"2020-01-{zero}{one}"
+    bounds = [
+        "2020",
+        "2021",
+        "2020-02",
+        "2020-02-29",
+        "2021-02-29",
+        "2020-12-31",
+        "2020-21",
+        "2020-22",
+        "2020-41",
+        "2020-42",
+        "\u0662\u0660\u0662\u0660",
+    ]
+    for start in bounds:
+        for end in bounds:
+            yield f"{start}/{end}"
+
+
+def _validation_outcome(validator, value):
+    """Validate a value, returning the error messages or exception type."""
+    try:
+        validator(value)
+        return True
+    except ValidationError as e:
+        return e.messages
+    except Exception as e:
+        # The EDTF parser fails on some seasons
+        return type(e)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"types": [Date, Interval]},
+        {"types": [Date, DateAndTime, Interval]},
+        {"types": [Interval]},
+        {"types": [EDTFObject], "chronological_interval": False},
+    ],
+)
+def test_level0_fast_path(kwargs):
+    fast = EDTFValidator(**kwargs)
+    reference = ParsingEDTFValidator(**kwargs)
+    for value in _level0_corpus():
+        assert _validation_outcome(fast, value) == _validation_outcome(
+            reference, value
+        ), value
+
+
+def test_load_parsed():
+    class ParsedSchema(Schema):
+        date = EDTFDateString(parsed=True)
+        lvl2 = EDTFLevel2DateString(parsed=True)
+
+    parse_edtf_cached.cache_clear()
+    data = ParsedSchema().load({"date": "2020-09/2020-10", "lvl2": "2020?"})
+    assert isinstance(data["date"], EDTFString)
+    assert data == {"date": "2020-09/2020-10", "lvl2": "2020?"}
+    assert json.dumps(data) == '{"date": "2020-09/2020-10", "lvl2": "2020?"}'
+    # Level 2 value was parsed by the validator and the result attached
+    assert data["lvl2"]._edtf is not None
+    assert data["lvl2"].lower_strict()[:3] == (2020, 1, 1)
+    assert data["lvl2"].upper_strict()[:3] == (2020, 12, 31)
+    # Level 0 value was validated without parsing and is parsed on demand
+    assert data["date"]._edtf is None
+    assert data["date"].lower_strict()[:3] == (2020, 9, 1)
+    assert data["date"].upper_strict()[:3] == (2020, 10, 31)
+    assert parse_edtf_cached.cache_info().misses == 2
+
+    # Dump keeps the original string and formatting reuses the parse result
+    assert TestSchemaDate().dump(data) == {"date": "2020-09/2020-10"}
+    assert FormatEDTF(format="short", locale="en").serialize("date", data) == (
+        "9/2020\u2009–\u200910/2020"
+    )
+    assert parse_edtf_cached.cache_info().misses == 2
+    assert pickle.loads(pickle.dumps(data["lvl2"])).edtf == data["lvl2"].edtf
+
+    assert ParsedSchema().load({"date": "2020"})["date"].edtf is not None
+    assert not isinstance(TestSchemaDate().load({"date": "2020"})["date"], EDTFString)
+
+
+def test_dump_date_range():
+    class RangeSchema(Schema):
+        range = EDTFDateRange(attribute="date")
+
+    s = RangeSchema()
+    edtf_date_range.cache_clear()
+    for value, expected in [
+        ("2020-09/2020-10", {"gte": "2020-09-01", "lte": "2020-10-31"}),
+        ("2020-02", {"gte": "2020-02-01", "lte": "2020-02-29"}),
+        ("2021-01-05", {"gte": "2021-01-05", "lte": "2021-01-05"}),
+        ("2020?", {"gte": "2020-01-01", "lte": "2020-12-31"}),
+        ("2020/..", {"gte": "2020-01-01"}),
+        ("2020-01-01T10:00:00", {"gte": "2020-01-01", "lte": "2020-01-01"}),
+        (
+            EDTFString("2004-06-~01/2004-06-~20"),
+            {"gte": "2004-06-01", "lte": "2004-06-20"},
+        ),
+    ]:
+        assert s.dump({"date": value}) == {"range": expected}
+        assert s.dump({"date": value}) == {"range": expected}
+
+    assert s.dump({"date": None}) == {"range": None}
+    assert s.dump({"date": "2021-02-29"}) == {}
+    assert s.dump({"date": "garbage"}) == {}
+    info = edtf_date_range.cache_info()
+    assert info.misses == 6 + 2
+    assert info.hits == 6
+
+    # Seasons and non-ASCII digits are left to the parser.
+    assert s.dump({"date": "2020-21/2020-22"}) == {
+        "range": {"gte": "2020-03-01", "lte": "2020-08-31"}
+    }
+    assert s.dump({"date": "\u0662\u0660\u0662\u0660"}) == {}
+    with pytest.raises(Exception):
+        edtf_date_range("\u0662\u0660\u0662\u0660")
+    assert info.hits == 6
+
+    # The sign of negative years is not part of the year width.
+    for value, expected in [
+        ("-0100", {"gte": "-0100-01-01", "lte": "-0100-12-31"}),
+        ("-0001-02", {"gte": "-0001-02-01", "lte": "-0001-02-28"}),
+        ("-0100/0100", {"gte": "-0100-01-01", "lte": "0100-12-31"}),
+        ("Y-170000002", {"gte": "-170000002-01-01", "lte": "-170000002-12-31"}),
+        ("Y170000002", {"gte": "170000002-01-01", "lte": "170000002-12-31"}),
+    ]:
+        assert s.dump({"date": value}) == {"range": expected}
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_validate_many(workers):
+    validator = EDTFValidator(types=[Date, Interval])
+    values = ["2020", "2021/2020", "2020?", "garbage", "2020-09/2020-10", "2021-02-29"]
+    errors = validator.validate_many(values * 3, workers=workers, chunk_size=4)
+    invalid = [i for i, v in enumerate(values * 3) if v not in ("2020", values[4])]
+    assert sorted(errors) == invalid
+    assert errors[3] == [EDTFValidator.default_message]
+
+
+def test_input_budget():
+    s = TestSchemaLVL2Date()
+    error = {"date": [EDTFValidator.default_message]}
+
+    # Largest set within the budget
+    max_set = "[" + ",".join(["2020-01-01"] * 10) + "]"
+    start = time.perf_counter()
+    assert s.load({"date": max_set})
+    assert time.perf_counter() - start < 5
+
+    # Adversarial input over the budget is rejected without parsing
+    for value in [
+        "[" + ",".join(["2020-01-01"] * 11) + "]",
+        "{" + ",".join(["2020"] * 1000) + "}",
+        "(" * 200 + "2004" + ")" * 200 + "?",
+        "2020-" * 1000,
+    ]:
+        start = time.perf_counter()
+        with pytest.raises(ValidationError) as e:
+            s.load({"date": value})
+        assert time.perf_counter() - start < 0.1
+        assert e.value.messages == error
+
+    # The budget is configurable
+    validator = EDTFValidator(types=None, max_length=None, max_set_size=None)
+    assert validator._within_budget("{" + ",".join(["2020"] * 1000) + "}")
@@ -9,13 +9,38 @@
 
 """Test LinksStore."""
 
+import copy
+import json
+import pickle
+import threading
+import warnings
+
 import pytest
 from marshmallow import Schema
+from marshmallow import fields as ma_fields
 from uritemplate import URITemplate
+from werkzeug.datastructures import MultiDict
 
 from marshmallow_utils import fields
-from marshmallow_utils.context import context_schema
-from marshmallow_utils.links import LinksFactory
+from marshmallow_utils.context import DumpScopeMixin, context_schema, dump_scope
+from marshmallow_utils.fields import links as links_fields
+from marshmallow_utils.fields.links import dump_links
+from marshmallow_utils.links import (
+    CompiledURITemplate,
+    LazyLink,
+    LazyLinks,
+    LinksFactory,
+    json_default,
+    materialize_links,
+)
+
+
+@pytest.fixture()
+def reset_deprecations():
+    """Reset the deprecated context keys already warned about."""
+    links_fields._warned_context_keys.clear()
+    yield
+    links_fields._warned_context_keys.clear()
 
 
 @pytest.fixture()
@@ -127,7 +152,7 @@ def test_permission_context(my_schema):
     assert "publish" in links
 
 
-def test_permission(my_schema):
+def test_permission(my_schema, reset_deprecations):
     """Test permission checks."""
     my_schema.context["field_permission_check"] = lambda a: a != "admin"
     with pytest.warns(DeprecationWarning):
@@ -136,7 +161,9 @@ def test_permission(my_schema):
     assert "publish" not in links
 
     my_schema.context["field_permission_check"] = lambda a: True
-    with pytest.warns(DeprecationWarning):
+    with warnings.catch_warnings():
+        # Deprecated context keys are only warned about once.
+        warnings.simplefilter("error")
         links = my_schema.dump({})["links"]
     assert "self" in links
     assert "publish" in links
@@ -159,3 +186,421 @@ def test_link_field_initialization():
     tpls = ["/records{?params*}", URITemplate("/records{?params*})")]
     for t in tpls:
         assert isinstance(fields.Link(template=t).template, URITemplate)
+
+
+def test_links_factory_schema_reuse():
+    """Test that links schemas are reused per namespace and thread."""
+
+    class ItemLinksSchema(Schema):
+        self = fields.Link(template=URITemplate("/1/{pid}"), params=lambda o: o)
+
+    f = LinksFactory(host="localhost", config={"item": ItemLinksSchema})
+    schema = f.get_schema("item", {"a": 1})
+    assert isinstance(schema, ItemLinksSchema)
+    assert f.get_schema("item", {"b": 2}) is schema
+    assert schema.context == {"b": 2}
+    assert f.get_schema("item", None).context == {}
+    assert f.get_schema("unknown", {}) is None
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(f.get_schema("item", {})))
+    thread.start()
+    thread.join()
+    assert other[0] is not schema
+    assert isinstance(other[0], ItemLinksSchema)
+
+
+@pytest.mark.parametrize("copy_factory", [copy.copy, copy.deepcopy, pickle.dumps])
+def test_links_factory_copy(copy_factory):
+    """Test that copies of a factory don't share their links schemas."""
+    f = LinksFactory(host="localhost", config={"item": Schema})
+    schema = f.get_schema("item", {})
+    f_copy = copy_factory(f)
+    if isinstance(f_copy, bytes):
+        f_copy = pickle.loads(f_copy)
+    assert f_copy.host == "localhost"
+    assert isinstance(f_copy.get_schema("item", {}), Schema)
+    assert f_copy.get_schema("item", {}) is not schema
+    assert f.get_schema("item", {}) is schema
+
+
+def _expand_outcome(template, *args, **kwargs):
+    """Expand a template, returning the exception type on errors."""
+    try:
+        return template.expand(*args, **kwargs)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize(
+    "uri",
+    [
+        "/records",
+        "/records/{pid}",
+        "/records/{pid}/files/{key}/content",
+        "{scheme_host}/{pid}{pid}",
+        "/literal}/{pid}/{{x}",
+        "/records{?params*}",
+        "/records/{+path}",
+        "/records/{pid:3}",
+        "/records/{pid,key}",
+    ],
+)
+def test_compiled_uri_template(uri):
+    """Compiled templates expand byte-identical to URITemplate."""
+    values = [
+        "12345",
+        "",
+        "a b/c?d&e=f#g",
+        "~._-",
+        "æøå ünï€ode",
+        "%20",
+        0,
+        -7,
+        True,
+        3.5,
+        b"bytes",
+        None,
+        ["a", "b c"],
+        ("x", 1),
+        [("k", "v w")],
+        {"k": "v", "a": 1},
+    ]
+    compiled = CompiledURITemplate(uri)
+    reference = URITemplate(uri)
+    assert compiled == reference
+    assert compiled.variable_names == reference.variable_names
+    assert compiled.expand() == reference.expand()
+    for value in values:
+        for other in [None, "k/1", 2]:
+            kwargs = {"pid": value, "key": other, "path": value}
+            assert _expand_outcome(compiled, **kwargs) == _expand_outcome(
+                reference, **kwargs
+            )
+            assert _expand_outcome(compiled, kwargs, pid=other) == _expand_outcome(
+                reference, kwargs, pid=other
+            )
+
+
+def test_link_template_compiled():
+    """Link fields compile their template at construction."""
+    link = fields.Link(template=URITemplate("/records/{pid}"))
+    assert isinstance(link.template, CompiledURITemplate)
+    assert link.template.uri == "/records/{pid}"
+    f = LinksFactory(host="localhost")
+    assert (
+        f.create_link(link.template, {"pid": "a/b"})
+        == "https://localhost/records/a%2Fb"
+    )
+
+
+def test_links_page_rendering():
+    """Links of a many=True dump are rendered for the whole page at once."""
+    calls = {"host": 0, "permission": 0}
+
+    def get_host():
+        calls["host"] += 1
+        return "localhost"
+
+    def permission_check(action):
+        calls["permission"] += 1
+        return action != "admin"
+
+    class ItemLinksSchema(Schema):
+        self = fields.Link(template="/records/{id}", params=lambda o: {"id": o["id"]})
+        files = fields.Link(
+            template="/records/{id}/files",
+            params=lambda o: {"id": o["id"]},
+            when=lambda o: o["id"] % 2,
+            data_key="files_url",
+        )
+        publish = fields.Link(
+            template="/records/{id}/publish",
+            params=lambda o: {"id": o["id"]},
+            permission="admin",
+        )
+
+    class ItemSchema(DumpScopeMixin, Schema):
+        id = ma_fields.Integer()
+        links = fields.Links()
+
+    factory = LinksFactory(host=get_host, config={"item": ItemLinksSchema})
+    context_schema.set(
+        {"links_factory": factory, "field_permission_check": permission_check}
+    )
+    schema = ItemSchema(context={"links_factory": factory, "links_namespace": "item"})
+    hits = [{"id": i} for i in range(10)]
+    hits.append(hits[0])
+
+    result = schema.dump(hits, many=True)
+    # The host is resolved once per dump, the permission once per request.
+    assert calls == {"host": 1, "permission": 1}
+    assert result == [Schema.dump(schema, hit) for hit in hits]
+    assert result[1] == {
+        "id": 1,
+        "links": {
+            "self": "https://localhost/records/1",
+            "files_url": "https://localhost/records/1/files",
+        },
+    }
+    assert result[2]["links"] == {"self": "https://localhost/records/2"}
+    assert dump_links(factory.get_schema("item", {}), hits) == [
+        r["links"] for r in result
+    ]
+
+
+def test_link_context_resolved_once(reset_deprecations):
+    """The links context and host are resolved once per dump scope."""
+    calls = []
+
+    def get_host():
+        calls.append(1)
+        return "localhost"
+
+    class ItemLinksSchema(Schema):
+        self = fields.Link(template="/records/{id}", params=lambda o: o)
+        files = fields.Link(template="/records/{id}/files", params=lambda o: o)
+
+    class ItemSchema(Schema):
+        links = fields.Links()
+
+    factory = LinksFactory(host=get_host, config={"item": ItemLinksSchema})
+    context = {"links_factory": factory, "links_namespace": "item"}
+    hits = [{"id": i} for i in range(5)]
+
+    # Without a dump scope, the links of each object share the lookups.
+    with pytest.warns(DeprecationWarning, match="links_factory") as record:
+        result = ItemSchema(context=context).dump(hits, many=True)
+    assert len([w for w in record if "links_factory" in str(w.message)]) == 1
+    assert result[4] == {
+        "links": {
+            "self": "https://localhost/records/4",
+            "files": "https://localhost/records/4/files",
+        }
+    }
+    assert len(calls) == 5
+
+    calls.clear()
+    with dump_scope():
+        assert ItemSchema(context=context).dump(hits, many=True) == result
+    assert len(calls) == 1
+
+
+def test_lazy_links():
+    """Lazy links are only expanded when they are used."""
+    expanded = []
+
+    class CountingFactory(LinksFactory):
+        def expand_link(self, template, vars, host):
+            expanded.append(template.uri)
+            return super().expand_link(template, vars, host)
+
+    class ItemLinksSchema(Schema):
+        self = fields.Link(template="/records/{id}", params=lambda o: o, lazy=True)
+        files = fields.Link(
+            template="/records/{id}/files", params=lambda o: o, lazy=True
+        )
+
+    class ItemSchema(DumpScopeMixin, Schema):
+        id = ma_fields.Integer()
+        links = fields.Links(lazy=True)
+
+    factory = CountingFactory(host="localhost", config={"item": ItemLinksSchema})
+    context_schema.set({"links_factory": factory})
+    schema = ItemSchema(context={"links_factory": factory, "links_namespace": "item"})
+    hits = [{"id": i} for i in range(3)]
+
+    result = schema.dump(hits, many=True)
+    assert isinstance(result[0]["links"], LazyLinks)
+    # Links are dumped in the context of the dump.
+    context_schema.set({})
+    assert json.loads(json.dumps(result, default=json_default))[1] == {
+        "id": 1,
+        "links": {
+            "self": "https://localhost/records/1",
+            "files": "https://localhost/records/1/files",
+        },
+    }
+    assert len(expanded) == 6
+
+    # Filtered out links are never expanded.
+    expanded.clear()
+    context_schema.set({"links_factory": factory})
+    result = schema.dump(hits, many=True)
+    assert [{"id": r["id"]} for r in result] == hits
+    links = result[2]["links"]
+    assert isinstance(links["self"], LazyLink)
+    assert links["self"] == "https://localhost/records/2"
+    assert expanded == ["/records/{id}"]
+
+    assert materialize_links(result)[2] == {
+        "id": 2,
+        "links": {
+            "self": "https://localhost/records/2",
+            "files": "https://localhost/records/2/files",
+        },
+    }
+    assert len(expanded) == 6
+    with pytest.raises(TypeError):
+        json_default(object())
+
+
+def test_link_params_variables():
+    """Params are computed for the variables of the template only."""
+    requested = []
+
+    def params(obj, variables):
+        requested.append(variables)
+        return {v: obj[v] for v in variables}
+
+    class Parent:
+        id = "p1"
+
+    class ItemLinksSchema(Schema):
+        self = fields.Link(template="/records/{id}", params=params)
+        parent = fields.Link(
+            template="/records/{parent_id}/versions{?size}",
+            params={
+                "parent_id": "parent.id",
+                "size": lambda o: 10,
+                "bucket": "files.bucket",
+            },
+        )
+        unknown = fields.Link(template="/records/{id}", params={"id": "a.b.c"})
+
+    factory = LinksFactory(host="localhost")
+    context_schema.set({"links_factory": factory})
+    obj = {"id": "r1", "parent": Parent()}
+    assert ItemLinksSchema().dump(obj) == {
+        "self": "https://localhost/records/r1",
+        "parent": "https://localhost/records/p1/versions?size=10",
+        "unknown": "https://localhost/records/",
+    }
+    assert requested == [frozenset(["id"])]
+    assert ItemLinksSchema().fields["parent"].params(obj) == {
+        "parent_id": "p1",
+        "size": 10,
+    }
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        {"q": "title:(a b)", "sort": "newest", "size": 10, "type": ["A", "B"]},
+        MultiDict([("q", "ü&x"), ("type", "B"), ("type", "A"), ("size", "10")]),
+        {},
+    ],
+)
+def test_pagination_links(args):
+    """Pagination links are identical to the links created one by one."""
+    factory = LinksFactory(host="localhost")
+    template = URITemplate("/records{?args*}")
+    pages = {
+        "self": {"page": 2},
+        "prev": {"page": 1},
+        "next": {"page": 3},
+        "first": {"page": "first"},
+        # Not substituted, but expanded.
+        "last": {"page": "a b"},
+        "other": {"page": 1, "size": 5},
+    }
+    vars = {"args": args}
+    links = factory.create_pagination_links(template, vars, pages)
+    assert vars == {"args": args}
+    for name, page_args in pages.items():
+        if isinstance(args, MultiDict):
+            page_vars = {"args": args.copy()}
+            for k, v in page_args.items():
+                page_vars["args"].setlist(k, [v])
+        else:
+            page_vars = {"args": {**args, **page_args}}
+        assert links[name] == factory.create_link(template, page_vars)
+    assert links["prev"].startswith("https://localhost/records?")
+    assert "page=1" in links["prev"]
+
+
+def test_preprocess_vars_copy():
+    """Preprocessing does not modify the template variables."""
+    vars = {"args": {"type": ["A", "B"]}, "pid": 1}
+    assert LinksFactory.preprocess_vars(vars) == {
+        "args": [("type", "A"), ("type", "B")],
+        "pid": 1,
+    }
+    assert vars == {"args": {"type": ["A", "B"]}, "pid": 1}
+
+
+def test_links_page_nested_dump():
+    """Links of objects outside of the page are dumped per object."""
+
+    class RecordLinksSchema(Schema):
+        self = fields.Link(template="/records/{id}", params=lambda o: {"id": o["id"]})
+
+    class FileLinksSchema(Schema):
+        content = fields.Link(
+            template="/files/{key}", params=lambda o: {"key": o["key"]}
+        )
+
+    factory = LinksFactory(
+        host="localhost", config={"record": RecordLinksSchema, "file": FileLinksSchema}
+    )
+
+    class FileSchema(DumpScopeMixin, Schema):
+        key = ma_fields.String()
+        links = fields.Links()
+
+    class RecordSchema(DumpScopeMixin, Schema):
+        files = ma_fields.Method("dump_files")
+        links = fields.Links()
+
+        def dump_files(self, obj):
+            context = {"links_factory": factory, "links_namespace": "file"}
+            return FileSchema(context=context).dump(obj["files"], many=True)
+
+    context_schema.set({"links_factory": factory})
+    schema = RecordSchema(
+        context={"links_factory": factory, "links_namespace": "record"}
+    )
+    hits = [{"id": i, "files": [{"key": f"f{i}"}]} for i in range(3)]
+    assert schema.dump(hits, many=True)[1] == {
+        "files": [{"key": "f1", "links": {"content": "https://localhost/files/f1"}}],
+        "links": {"self": "https://localhost/records/1"},
+    }
+
+
+def test_links_page_custom_serialization():
+    """Customized link serialization is kept when rendering a page."""
+
+    class MyLink(fields.Link):
+        def _serialize(self, value, attr, obj, *args, **kwargs):
+            return f"custom-{obj['id']}"
+
+    class MyLinksSchema(Schema):
+        self = MyLink(template="/r/{id}", params=lambda o: {"id": o["id"]})
+
+    class UpperLinksSchema(Schema):
+        self = fields.Link(template="/r/{id}", params=lambda o: {"id": o["id"]})
+
+        def dump(self, obj, *, many=None):
+            result = super().dump(obj, many=many)
+            if many:
+                return [{k: v.upper() for k, v in r.items()} for r in result]
+            return {k: v.upper() for k, v in result.items()}
+
+    factory = LinksFactory(
+        host="h", config={"custom": MyLinksSchema, "upper": UpperLinksSchema}
+    )
+    context_schema.set({"links_factory": factory})
+    hits = [{"id": i} for i in range(3)]
+    for namespace, expected in [("custom", "custom-1"), ("upper", "HTTPS://H/R/1")]:
+        context = {"links_factory": factory, "links_namespace": namespace}
+
+        class PlainSchema(Schema):
+            id = ma_fields.Integer()
+            links = fields.Links()
+
+        class ScopedSchema(DumpScopeMixin, PlainSchema):
+            pass
+
+        for schema_cls in (PlainSchema, ScopedSchema):
+            result = schema_cls(context=context).dump(hits, many=True)
+            assert result[1] == {"id": 1, "links": {"self": expected}}